@@ -0,0 +1,163 @@
+# audit_log.py
+#
+# Append-only record of moderation actions.
+#
+#   python audit_log.py user 123456789012345678      # everything done to a user
+#   python audit_log.py rules 24                     # actions per rule per hour, last 24h
+
+import os
+import sys
+import time
+import queue
+import atexit
+import sqlite3
+import logging
+import threading
+
+_STOP = object()
+
+
+def connect(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS audit (
+            id INTEGER PRIMARY KEY,
+            ts REAL NOT NULL,
+            action TEXT NOT NULL,
+            user_id INTEGER,
+            guild_id INTEGER,
+            rule TEXT,
+            latency_ms REAL,
+            content_hash TEXT,
+            detail TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS audit_user ON audit (user_id, ts)")
+    conn.execute("CREATE INDEX IF NOT EXISTS audit_rule ON audit (rule, ts)")
+    return conn
+
+
+class AuditLog:
+    """Moderation actions written behind to SQLite from a background thread.
+
+    ``record`` only puts a tuple on an in-memory queue, so it never blocks
+    the gateway loop. The writer thread flushes in batches of up to
+    ``batch_size`` rows, or whatever arrived within ``flush_interval``
+    seconds. If the queue is full the record is counted as dropped.
+    """
+
+    def __init__(self, path, batch_size=200, flush_interval=2.0, max_pending=100_000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_pending)
+        self.written = 0
+        self.dropped = 0
+        connect(path).close()  # create the schema up front
+        self._thread = threading.Thread(target=self._writer, name="audit-log", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __len__(self):
+        return self._queue.qsize()
+
+    def record(self, action, user_id=None, guild_id=None, rule=None,
+               latency_ms=None, content_hash=None, detail=None):
+        row = (
+            time.time(), action, user_id, guild_id, rule, latency_ms,
+            f"{content_hash:016x}" if content_hash is not None else None, detail,
+        )
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    def _writer(self):
+        conn = connect(self.path)
+        try:
+            stopping = False
+            while not stopping:
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+                batch = []
+                while item is not _STOP:
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                stopping = item is _STOP
+                if batch:
+                    try:
+                        conn.executemany(
+                            "INSERT INTO audit (ts, action, user_id, guild_id, rule, latency_ms, content_hash, detail) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            batch,
+                        )
+                        conn.commit()
+                        self.written += len(batch)
+                    except sqlite3.Error as e:
+                        self.dropped += len(batch)
+                        logging.error(f"Audit log write failed: {e}")
+        finally:
+            conn.close()
+
+    def close(self):
+        """Flush what is queued and stop the writer."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout=10)
+
+
+# ----------- Queries -----------
+
+def actions_for_user(conn, user_id, limit=50):
+    return conn.execute(
+        "SELECT ts, action, guild_id, rule, latency_ms, content_hash, detail FROM audit "
+        "WHERE user_id = ? ORDER BY ts DESC LIMIT ?",
+        (user_id, limit),
+    ).fetchall()
+
+
+def actions_per_rule_per_hour(conn, since):
+    return conn.execute(
+        "SELECT rule, CAST(ts / 3600 AS INTEGER) * 3600 AS hour, COUNT(*) FROM audit "
+        "WHERE rule IS NOT NULL AND ts >= ? GROUP BY rule, hour ORDER BY hour, rule",
+        (since,),
+    ).fetchall()
+
+
+# ----------- Command Line -----------
+
+def main(argv):
+    path = os.getenv("AUDIT_DB", "audit.db")
+    usage = "usage: audit_log.py user USER_ID | rules [HOURS]"
+    if not argv or argv[0] not in ("user", "rules"):
+        print(usage)
+        return 1
+
+    conn = connect(path)
+    try:
+        if argv[0] == "user" and len(argv) == 2:
+            for ts, action, guild_id, rule, latency_ms, content_hash, detail in actions_for_user(conn, int(argv[1])):
+                stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+                print(f"{stamp}  {action:<16} guild={guild_id} rule={rule} {latency_ms or 0:.1f}ms {content_hash or ''} {detail or ''}")
+        elif argv[0] == "rules":
+            hours = int(argv[1]) if len(argv) > 1 else 24
+            for rule, hour, count in actions_per_rule_per_hour(conn, time.time() - hours * 3600):
+                print(f"{time.strftime('%Y-%m-%d %H:00', time.localtime(hour))}  {rule:<32} {count}")
+        else:
+            print(usage)
+            return 1
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
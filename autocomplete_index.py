@@ -0,0 +1,73 @@
+# autocomplete_index.py
+
+import heapq
+from bisect import bisect_left
+from collections import OrderedDict
+
+MAX_CHOICES = 25  # Discord's autocomplete limit
+
+
+class AutocompleteIndex:
+    """Prefix and substring lookups over a catalog's keys.
+
+    Built once per catalog load: a sorted array of lowercased keys answers
+    prefix queries by bisect, and an n-gram index (1 to 3 characters)
+    narrows substring queries to the keys sharing every gram of the query.
+    Results are cached per query; building a new index for a reloaded
+    catalog drops the old cache with it.
+    """
+
+    def __init__(self, keys, cache_size=1024):
+        self.keys = sorted(dict.fromkeys(keys), key=str.lower)
+        self._lower = [k.lower() for k in self.keys]
+        self._grams = {}
+        for i, key in enumerate(self._lower):
+            for n in (1, 2, 3):
+                for j in range(len(key) - n + 1):
+                    self._grams.setdefault(key[j:j + n], set()).add(i)
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _prefix(self, query, limit):
+        lower = self._lower
+        start = bisect_left(lower, query)
+        found = []
+        for i in range(start, len(lower)):
+            if not lower[i].startswith(query) or len(found) >= limit:
+                break
+            found.append(i)
+        return found
+
+    def _substring(self, query):
+        if len(query) <= 3:
+            return self._grams.get(query, set())
+        grams = [query[j:j + 3] for j in range(len(query) - 2)]
+        postings = sorted((self._grams.get(g, set()) for g in grams), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return {i for i in candidates if query in self._lower[i]}
+
+    def search(self, query, limit=MAX_CHOICES):
+        """Return up to ``limit`` keys: prefix matches first, then other substring matches."""
+        query = query.lower()
+        cached = self._cache.get(query)
+        if cached is not None:
+            self._cache.move_to_end(query)
+            return cached[:limit]
+
+        if not query:
+            result = self.keys[:MAX_CHOICES]
+        else:
+            ids = self._prefix(query, MAX_CHOICES)
+            if len(ids) < MAX_CHOICES:
+                prefixed = set(ids)
+                rest = (i for i in self._substring(query) if i not in prefixed)
+                ids += heapq.nsmallest(MAX_CHOICES - len(ids), rest)
+            result = [self.keys[i] for i in ids]
+
+        self._cache[query] = result
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return result[:limit]
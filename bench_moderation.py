@@ -0,0 +1,294 @@
+# bench_moderation.py
+#
+# Pushes a synthetic message corpus through the same moderation steps as
+# nottherealepic.on_message, without a Discord connection.
+#
+#   python bench_moderation.py --messages 50000
+#   python bench_moderation.py --engine naive --extra-words 5000
+
+import gc
+import sys
+import time
+import random
+import string
+import argparse
+import tracemalloc
+
+from filter_lists import bad_words, blocked_domains
+from word_filter import KeywordMatcher, ReloadableMatcher, normalize_text, fold_leet
+from domain_filter import DomainBlocklist
+from spam_tracker import UserMessageTracker, ContentIndex, NearDuplicateIndex, ImageHashIndex, content_hash
+from spam_tracker import CROSS_ACCOUNT_MIN_LENGTH, CROSS_ACCOUNT_MIN_GUILDS, CROSS_ACCOUNT_MIN_USERS
+
+# ----------- Synthetic Corpus -----------
+
+CHAT_WORDS = (
+    "hey guys anyone know how to fix the crash when loading the new car mod "
+    "it works fine in single player but online it breaks thanks for the help "
+    "update is out check the changelog lol same here bro nice model gg"
+).split()
+
+SPAM_LINES = [
+    "free nitro for everyone claim now at {url}",
+    "steam gift giveaway click here {url}",
+    "@everyone free robux drop {url} hurry",
+    "verify to claim your nitro gift {url}",
+]
+
+SPAM_HOSTS = [
+    "discord-airdrop.com", "nitro-gift.xyz", "steamcommunity-offer.site",
+    "bit.ly/3xYz", "d1scord.gift", "login-steam.xyz",
+]
+
+CLEAN_HOSTS = [
+    "github.com/user/repo", "youtube.com/watch?v=abc", "gta5-mods.com/vehicles",
+    "discord.gg/invite", "imgur.com/a/xyz", "docs.google.com/document/d/1",
+]
+
+FANCY = {c: chr(0x1D41A + i) for i, c in enumerate(string.ascii_lowercase)}  # bold
+HOMOGLYPH = {"a": "а", "e": "е", "o": "о", "i": "і", "c": "с", "p": "р"}
+
+
+def _chat(rng):
+    return " ".join(rng.choice(CHAT_WORDS) for _ in range(rng.randint(3, 20)))
+
+
+def _obfuscate(rng, text):
+    style = rng.randrange(3)
+    if style == 0:
+        return "".join(FANCY.get(c, c) for c in text)
+    if style == 1:
+        return "".join(HOMOGLYPH.get(c, c) for c in text)
+    return text.replace("o", "0").replace("i", "1").upper()
+
+
+def _image(rng):
+    """Random 64-bit stand-in for an attachment's perceptual hash."""
+    return rng.getrandbits(64)
+
+
+def build_corpus(rng, count, guilds=50, users=2000):
+    """Mix of clean chat, obfuscated spam, link-heavy posts and multi-guild bursts.
+
+    Returns a list of ``(text, guild_id, user_id, channel_id, message_id, image_hashes)``.
+    """
+    message_id = 0
+    corpus = []
+    while len(corpus) < count:
+        kind = rng.random()
+        user = rng.randrange(users)
+        if kind < 0.70:
+            text = _chat(rng)
+            images = [_image(rng)] if rng.random() < 0.1 else []
+            batch = [(text, rng.randrange(guilds), user, images)]
+        elif kind < 0.82:
+            line = rng.choice(SPAM_LINES).format(url="https://" + rng.choice(SPAM_HOSTS))
+            batch = [(_obfuscate(rng, line), rng.randrange(guilds), user, [])]
+        elif kind < 0.94:
+            links = " ".join("https://" + rng.choice(CLEAN_HOSTS + SPAM_HOSTS) for _ in range(rng.randint(1, 5)))
+            batch = [(f"{_chat(rng)} {links}", rng.randrange(guilds), user, [])]
+        elif kind < 0.97:
+            # One payload pushed to several guilds, sometimes with a tweak per copy
+            base = rng.choice(SPAM_LINES).format(url="https://" + rng.choice(SPAM_HOSTS))
+            batch = [
+                (base + (" " + rng.choice("!?🎁🔥") if rng.random() < 0.5 else ""), gid, user, [])
+                for gid in rng.sample(range(guilds), rng.randint(5, 8))
+            ]
+        elif kind < 0.985:
+            # Same payload from a handful of accounts, one guild each
+            base = rng.choice(SPAM_LINES).format(url="https://" + rng.choice(SPAM_HOSTS))
+            batch = [(base, gid, rng.randrange(users), []) for gid in rng.sample(range(guilds), rng.randint(5, 8))]
+        else:
+            # Image-only spam (fake Nitro screenshot), re-encoded per copy
+            image = _image(rng)
+            batch = [
+                ("", gid, user, [image ^ (1 << rng.randrange(64))])
+                for gid in rng.sample(range(guilds), rng.randint(5, 8))
+            ]
+        for text, gid, uid, images in batch:
+            message_id += 1
+            corpus.append((text, gid, uid, gid * 1000, message_id, images))
+    return corpus[:count]
+
+
+def synthetic_entries(rng, count):
+    words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(6, 14))) for _ in range(count)]
+    hosts = [w + rng.choice([".com", ".xyz", ".gift", ".site"]) for w in words]
+    return words, hosts
+
+
+# ----------- Pipeline -----------
+
+class NaiveMatcher:
+    """The original ``any(word in text for word in bad_words)`` scan."""
+
+    def __init__(self, words):
+        self.words = list(words)
+
+    def search(self, text):
+        for word in self.words:
+            if word in text:
+                return word
+        folded = fold_leet(text)
+        if folded != text:
+            for word in self.words:
+                if word in folded:
+                    return word
+        return None
+
+
+class Pipeline:
+    def __init__(self, engine, words, domains):
+        if engine == "naive":
+            self.keywords = NaiveMatcher(words)
+        else:
+            self.keywords = ReloadableMatcher("/nonexistent", [])
+            self.keywords.matcher = KeywordMatcher(words)
+        self.domains = DomainBlocklist(domains)
+        self.tracker = UserMessageTracker()
+        self.index = ContentIndex()
+        self.near = NearDuplicateIndex()
+        self.images = ImageHashIndex()
+        self.stage_ns = dict.fromkeys(("normalize", "tracker", "near_dup", "images", "keywords", "domains"), 0)
+        self.rules = dict.fromkeys(
+            ("same_user_multi_guild", "cross_account", "near_duplicate", "image_multi_guild", "keyword_timeout"), 0
+        )
+        self.flagged = 0
+
+    def process(self, text, guild_id, user_id, channel_id, message_id, images, now):
+        """One message through the same rules, in the same order, as ``on_message``."""
+        clock = time.perf_counter_ns
+        stage = self.stage_ns
+
+        t0 = clock()
+        norm = normalize_text(text)
+        t1 = clock()
+        key = content_hash(norm)
+        guilds = index_guilds = index_users = 0
+        if norm.strip():
+            guilds = self.tracker.record(user_id, key, guild_id, channel_id, message_id, now=now)
+            index_guilds, index_users = self.index.record(key, guild_id, user_id, channel_id, message_id, now=now)
+        cross_account = (
+            len(norm) >= CROSS_ACCOUNT_MIN_LENGTH
+            and index_guilds >= CROSS_ACCOUNT_MIN_GUILDS
+            and index_users >= CROSS_ACCOUNT_MIN_USERS
+        )
+        t2 = clock()
+        near = 0
+        if len(norm) >= CROSS_ACCOUNT_MIN_LENGTH:
+            near_guilds, near_users, near_user_guilds = self.near.record(
+                norm, guild_id, user_id, channel_id, message_id, now=now, enough_users=CROSS_ACCOUNT_MIN_USERS
+            )
+            if near_user_guilds >= 5 or near_users >= CROSS_ACCOUNT_MIN_USERS:
+                near = near_guilds
+        t3 = clock()
+        image = 0
+        for h in images:
+            image_guilds, image_users, image_user_guilds = self.images.record(
+                h, guild_id, user_id, channel_id, message_id, now=now
+            )
+            if image_guilds >= 5 and (image_user_guilds >= 5 or image_users >= CROSS_ACCOUNT_MIN_USERS):
+                image = max(image, image_guilds)
+        t4 = clock()
+
+        if guilds >= 5:
+            rule = "same_user_multi_guild"
+        elif cross_account:
+            rule = "cross_account"
+        elif near >= 5:
+            rule = "near_duplicate"
+        elif image >= 5:
+            rule = "image_multi_guild"
+        elif self.keywords.search(norm) is not None:
+            rule = "keyword_timeout"
+        else:
+            rule = None
+        t5 = clock()
+        if rule is None and self.domains.search(norm) is not None:
+            rule = "keyword_timeout"
+        t6 = clock()
+
+        stage["normalize"] += t1 - t0
+        stage["tracker"] += t2 - t1
+        stage["near_dup"] += t3 - t2
+        stage["images"] += t4 - t3
+        stage["keywords"] += t5 - t4
+        stage["domains"] += t6 - t5
+        if rule is not None:
+            self.rules[rule] += 1
+            self.flagged += 1
+        return t6 - t0
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0
+    k = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    extra_words, extra_hosts = synthetic_entries(rng, args.extra_words)
+    words = list(bad_words) + extra_words
+    domains = list(blocked_domains) + extra_hosts
+    corpus = build_corpus(rng, args.messages, guilds=args.guilds)
+
+    normalize_text.cache_clear()
+    gc.collect()
+    pipeline = Pipeline(args.engine, words, domains)
+
+    latencies = []
+    # Spread the corpus over --span seconds so the 10-minute windows expire
+    step = args.span / max(1, len(corpus))
+    start = time.perf_counter()
+    for i, (text, gid, uid, cid, mid, images) in enumerate(corpus):
+        latencies.append(pipeline.process(text, gid, uid, cid, mid, images, now=i * step))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    # Memory is measured on a separate pass: tracemalloc slows everything down.
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    probe = Pipeline(args.engine, [], [])
+    for i, (text, gid, uid, cid, mid, images) in enumerate(corpus):
+        probe.process(text, gid, uid, cid, mid, images, now=i * step)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    tracker_bytes = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+    us = 1 / 1000
+    print(f"engine={args.engine} keywords={len(words)} domains={len(domains)} messages={len(corpus)}")
+    print(f"throughput   {len(corpus) / elapsed:,.0f} msg/s  ({elapsed:.2f}s total)")
+    print(
+        "latency us   "
+        f"p50={percentile(latencies, 50) * us:.1f} "
+        f"p90={percentile(latencies, 90) * us:.1f} "
+        f"p99={percentile(latencies, 99) * us:.1f} "
+        f"max={latencies[-1] * us:.1f}"
+    )
+    print("stage us/msg " + " ".join(
+        f"{name}={total * us / len(corpus):.2f}" for name, total in pipeline.stage_ns.items()
+    ))
+    print(f"flagged      {pipeline.flagged} ({pipeline.flagged / len(corpus):.1%})")
+    print("rules        " + " ".join(f"{name}={count}" for name, count in pipeline.rules.items()))
+    print(
+        f"tracker mem  {tracker_bytes / 1024:,.0f} KiB "
+        f"(users={len(probe.tracker)} index={len(probe.index)} near_dup={len(probe.near)} "
+        f"images={len(probe.images)})"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the on_message moderation pipeline.")
+    parser.add_argument("--messages", type=int, default=20000, help="corpus size")
+    parser.add_argument("--engine", choices=("aho", "naive"), default="aho", help="keyword matching engine")
+    parser.add_argument("--extra-words", type=int, default=0, help="synthetic keywords/domains to add to the lists")
+    parser.add_argument("--guilds", type=int, default=50, help="guilds the corpus is spread over")
+    parser.add_argument("--span", type=float, default=3600.0, help="simulated seconds the corpus covers")
+    parser.add_argument("--seed", type=int, default=1)
+    run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+# catalog_store.py
+#
+# On-disk catalog for files, licences, paid IDs and pro file info.
+#
+#   python catalog_store.py import                   # seed from the .py dicts
+#   python catalog_store.py list files
+#   python catalog_store.py set files MyMod '{"size": "10MB", ...}'
+#   python catalog_store.py delete paid_ids epic0042
+#
+# The running bot notices the change within a few seconds and swaps it in.
+
+import os
+import sys
+import json
+import sqlite3
+import asyncio
+import logging
+
+CATALOGS = ("files", "licenses", "paid_ids", "pro_files")
+
+# Where each catalog came from before the store existed
+SEED_MODULES = {
+    "files": ("files", "files_data"),
+    "licenses": ("licence", "license_descriptions"),
+    "paid_ids": ("paid_id", "paid_id_data"),
+    "pro_files": ("pro_file_info", "pro_file_info"),
+}
+
+
+def connect(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS entries (
+            catalog TEXT NOT NULL,
+            key TEXT NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (catalog, key)
+        )
+    """)
+    return conn
+
+
+def seed_from_modules(conn):
+    """Copy the legacy Python dict modules into the store."""
+    import importlib
+    for catalog, (module_name, attr) in SEED_MODULES.items():
+        data = getattr(importlib.import_module(module_name), attr)
+        conn.executemany(
+            "INSERT OR REPLACE INTO entries (catalog, key, data) VALUES (?, ?, ?)",
+            [(catalog, key, json.dumps(value)) for key, value in data.items()],
+        )
+    conn.commit()
+
+
+class CatalogSnapshot:
+    """One consistent, read-only load of every catalog plus its derived views."""
+
+    def __init__(self, tables, views):
+        self.tables = tables
+        self.views = views
+
+    def __getitem__(self, catalog):
+        return self.tables[catalog]
+
+
+class CatalogStore:
+    """SQLite-backed catalogs served from an in-memory snapshot.
+
+    Lookups are plain dict reads on the current snapshot. Views (autocomplete
+    indexes, caches, ...) registered with ``add_view`` are rebuilt on every
+    load and swapped in together with the data, so readers never see a
+    catalog paired with a stale index.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._view_builders = {}
+        self._stamp = None
+
+        if not os.path.exists(path):
+            logging.info(f"📦 Creating {path} from the bundled catalog modules.")
+            conn = connect(path)
+            try:
+                seed_from_modules(conn)
+            finally:
+                conn.close()
+        self.snapshot = CatalogSnapshot({name: {} for name in CATALOGS}, {})
+
+    def __getitem__(self, catalog):
+        return self.snapshot.tables[catalog]
+
+    def view(self, name):
+        return self.snapshot.views[name]
+
+    def add_view(self, name, builder):
+        """Register ``builder(tables)``; its result is available as ``view(name)``."""
+        self._view_builders[name] = builder
+
+    def _file_stamp(self):
+        stamp = []
+        for suffix in ("", "-wal"):
+            try:
+                st = os.stat(self.path + suffix)
+            except OSError:
+                stamp.append(None)
+                continue
+            # Readers create an empty -wal file; that is not a change.
+            stamp.append((st.st_mtime_ns, st.st_size) if st.st_size else None)
+        return tuple(stamp)
+
+    def _build(self):
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        try:
+            tables = {name: {} for name in CATALOGS}
+            for catalog, key, data in conn.execute("SELECT catalog, key, data FROM entries ORDER BY rowid"):
+                if catalog in tables:
+                    tables[catalog][key] = json.loads(data)
+        finally:
+            conn.close()
+        views = {name: builder(tables) for name, builder in self._view_builders.items()}
+        return CatalogSnapshot(tables, views)
+
+    def load(self):
+        """Load synchronously; used once at startup before the bot connects."""
+        self._stamp = self._file_stamp()
+        self.snapshot = self._build()
+        counts = ", ".join(f"{name}={len(rows)}" for name, rows in self.snapshot.tables.items())
+        logging.info(f"📦 Catalog loaded ({counts}).")
+
+    async def reload_if_changed(self):
+        """Rebuild in a worker thread if the database changed. Returns True on swap."""
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return False
+        try:
+            snapshot = await asyncio.to_thread(self._build)
+        except Exception as e:
+            logging.error(f"Failed to reload catalog from {self.path}: {e}")
+            return False
+        self._stamp = stamp
+        self.snapshot = snapshot
+        counts = ", ".join(f"{name}={len(rows)}" for name, rows in snapshot.tables.items())
+        logging.info(f"🔁 Catalog reloaded ({counts}).")
+        return True
+
+
+# ----------- Command Line -----------
+
+def main(argv):
+    path = os.getenv("CATALOG_DB", "catalog.db")
+    usage = "usage: catalog_store.py import | list CATALOG | set CATALOG KEY JSON | delete CATALOG KEY"
+    if not argv:
+        print(usage)
+        return 1
+
+    conn = connect(path)
+    try:
+        command, args = argv[0], argv[1:]
+        if command == "import":
+            seed_from_modules(conn)
+        elif command == "list" and len(args) == 1:
+            for (key,) in conn.execute("SELECT key FROM entries WHERE catalog = ? ORDER BY key", args):
+                print(key)
+        elif command == "set" and len(args) == 3 and args[0] in CATALOGS:
+            json.loads(args[2])  # reject bad JSON before writing
+            conn.execute("INSERT OR REPLACE INTO entries (catalog, key, data) VALUES (?, ?, ?)", args)
+            conn.commit()
+        elif command == "delete" and len(args) == 2:
+            conn.execute("DELETE FROM entries WHERE catalog = ? AND key = ?", args)
+            conn.commit()
+        else:
+            print(usage)
+            return 1
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,67 @@
+# code_registry.py
+
+import os
+import random
+import asyncio
+import threading
+
+CODE_PREFIX = "epic"
+CODE_SPACE = 10000  # epic0000 .. epic9999
+
+
+def format_code(number):
+    return f"{CODE_PREFIX}{number:04d}"
+
+
+class CodeRegistry:
+    """Allocates unique customer codes backed by an append-only log file.
+
+    The log is read once at startup into a set. The unused part of the code
+    space is shuffled up front, so each allocation is a list pop and never
+    retries on collisions. New codes are appended and fsync'd from a worker
+    thread so the gateway loop never waits on disk.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._write_lock = threading.Lock()
+        self.codes = set()
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                self.codes = {line.strip() for line in f if line.strip()}
+
+        self._free = [n for n in range(CODE_SPACE) if format_code(n) not in self.codes]
+        random.shuffle(self._free)
+
+    def __contains__(self, code):
+        return code in self.codes
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def remaining(self):
+        return len(self._free)
+
+    def _append(self, code):
+        with self._write_lock:
+            with open(self.path, "a") as f:
+                f.write(f"{code}\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    async def allocate(self):
+        """Reserve, persist and return a new code, or ``None`` if the space is used up."""
+        while self._free:
+            code = format_code(self._free.pop())
+            if code in self.codes:  # written by hand since startup
+                continue
+            self.codes.add(code)
+            try:
+                await asyncio.to_thread(self._append, code)
+            except OSError:
+                self.codes.discard(code)
+                self._free.append(int(code[len(CODE_PREFIX):]))
+                raise
+            return code
+        return None
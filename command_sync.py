@@ -0,0 +1,64 @@
+# command_sync.py
+
+import os
+import json
+import hashlib
+import logging
+
+# Unset: one ".command_sync.<application id>.json" per bot, since main.py
+# starts several bots side by side in the same directory
+SYNC_STATE_PATH = os.getenv("COMMAND_SYNC_STATE")
+
+
+def command_tree_hash(tree, guild=None):
+    """Hash of the payload ``tree.sync(guild=guild)`` would upload."""
+    payload = [command.to_dict(tree) for command in tree.get_commands(guild=guild)]
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def _load_state(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(path, key, digest):
+    # Re-read just before writing so entries saved meanwhile by another
+    # process sharing the file are kept, and give each process its own tmp file
+    state = _load_state(path)
+    state[key] = digest
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+async def sync_if_changed(tree, guild=None, path=None, force=False):
+    """Sync ``tree`` only when its commands changed since the last sync.
+
+    The hash of each guild's (or the global) command payload is stored in
+    ``path`` (by default a file per application), so reconnects and restarts with an unchanged
+    tree skip the rate-limited sync call. Returns the synced commands, or
+    ``None`` when the sync was skipped. Set ``FORCE_COMMAND_SYNC=1`` to sync
+    anyway, e.g. after commands were removed by hand.
+    """
+    force = force or os.getenv("FORCE_COMMAND_SYNC") == "1"
+    application_id = tree.client.application_id
+    path = path or SYNC_STATE_PATH or f".command_sync.{application_id}.json"
+    key = f"{application_id}:{guild.id if guild else 'global'}"
+    digest = command_tree_hash(tree, guild)
+
+    state = _load_state(path)
+    if not force and state.get(key) == digest:
+        logging.info(f"⏭️ Commands unchanged for {key}, skipping sync.")
+        return None
+
+    synced = await tree.sync(guild=guild)
+    try:
+        _save_state(path, key, digest)
+    except OSError as e:
+        logging.warning(f"⚠️ Could not save command sync state to {path}: {e}")
+    return synced
@@ -4,6 +4,8 @@ from discord.ext import commands
 import psycopg2
 import os
 from dotenv import load_dotenv
+from command_sync import sync_if_changed
+from memory_profile import MemoryProfile
 
 # ------------------- CONFIG from .env -------------------
 load_dotenv()
@@ -19,7 +21,8 @@ if not TOKEN or not DATABASE_URL:
 
 # ------------------- BOT SETUP -------------------
 intents = discord.Intents.default()
-bot = commands.Bot(command_prefix="!", intents=intents)
+memory = MemoryProfile("divine_hall", intents)
+bot = commands.Bot(command_prefix="!", **memory.options)
 
 # ------------------- NEW: DATABASE HELPER -------------------
 def get_db_connection():
@@ -86,8 +89,9 @@ async def update_lineup_message():
 @bot.event
 async def on_ready():
     # We no longer establish a global connection here.
-    await bot.tree.sync()
+    await sync_if_changed(bot.tree)
     print(f"Logged in as {bot.user}")
+    memory.report(bot)
     await update_lineup_message()
 
 # ------------------- SLASH COMMANDS (REWORKED FOR STABILITY) -------------------
@@ -0,0 +1,120 @@
+# dm_outbox.py
+
+import time
+import asyncio
+import logging
+from collections import OrderedDict, deque
+
+import discord
+
+
+class TokenBucket:
+    """``rate`` tokens per second, holding at most ``burst``."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+
+    async def take(self):
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class DMOutbox:
+    """Sends DMs from a queue, paced globally and fair across guilds.
+
+    Handlers call ``send`` and return at once. One worker drains the
+    per-guild queues round-robin, taking a token from a shared bucket per
+    DM, so one busy guild cannot starve the rest. A DM already waiting for
+    the same user with the same text is not queued again. While
+    ``raid_detector`` reports a guild as raiding, optional DMs from it are
+    dropped and the rest wait until the raid is over.
+    """
+
+    def __init__(self, resolver, raid_detector, rate=1.0, burst=5, max_per_guild=500):
+        self.resolver = resolver
+        self.raid_detector = raid_detector
+        self.bucket = TokenBucket(rate, burst)
+        self.max_per_guild = max_per_guild
+        self._queues = OrderedDict()  # guild_id -> deque of (user_id, content, optional)
+        self._queued = set()          # (user_id, content) waiting to be sent
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self.stats = {"sent": 0, "failed": 0, "coalesced": 0, "dropped": 0}
+
+    def __len__(self):
+        return len(self._queued)
+
+    def is_running(self):
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        self._task = asyncio.create_task(self._worker())
+
+    def is_raiding(self, guild_id):
+        return self.raid_detector.is_raiding(guild_id)
+
+    def send(self, guild_id, user_id, content, optional=True):
+        """Queue a DM; returns False if it was coalesced or dropped."""
+        key = (user_id, content)
+        if key in self._queued:
+            self.stats["coalesced"] += 1
+            return False
+        queue = self._queues.get(guild_id)
+        if optional and (self.is_raiding(guild_id) or (queue and len(queue) >= self.max_per_guild)):
+            self.stats["dropped"] += 1
+            return False
+        if queue is None:
+            queue = self._queues[guild_id] = deque()
+        queue.append((user_id, content, optional))
+        self._queued.add(key)
+        self._wakeup.set()
+        return True
+
+    def _next(self):
+        """Pop the next DM round-robin, skipping guilds that are mid-raid."""
+        for guild_id in list(self._queues):
+            if self.is_raiding(guild_id):
+                continue
+            queue = self._queues.pop(guild_id)
+            item = queue.popleft()
+            if queue:
+                self._queues[guild_id] = queue  # back of the line
+            return item
+        return None
+
+    async def _worker(self):
+        while True:
+            item = self._next()
+            if item is None:
+                self._wakeup.clear()
+                try:
+                    # Deferred guilds are rechecked once a second
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=1 if self._queues else None)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            user_id, content, _ = item
+            self._queued.discard((user_id, content))
+            await self.bucket.take()
+            try:
+                user = await self.resolver.user(user_id)
+                if user is None:
+                    raise ValueError("unknown user")
+                await user.send(content)
+                self.stats["sent"] += 1
+            except discord.HTTPException as e:
+                self.stats["failed"] += 1
+                logging.debug(f"DM to {user_id} failed: {e}")
+            except Exception as e:  # keep the worker alive
+                self.stats["failed"] += 1
+                logging.warning(f"DM to {user_id} failed: {e}")
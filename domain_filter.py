@@ -0,0 +1,106 @@
+# domain_filter.py
+
+import re
+
+from word_filter import ReloadableMatcher, fold_leet
+
+# Hosts with or without a scheme: "https://bit.ly/x", "discord-gift.com".
+_HOST_RE = re.compile(
+    r"(?<![a-z0-9.-])(?:[a-z][a-z0-9+.-]*://)?"
+    r"((?:[a-z0-9](?:[a-z0-9-]*[a-z0-9])?\.)+[a-z][a-z0-9-]*[a-z0-9])"
+)
+
+_END = ""  # trie key marking a complete entry; never a valid label/char
+
+
+def extract_hosts(text):
+    """Return the unique hostnames linked in normalized message text."""
+    if "." not in text:
+        return []
+    return list(dict.fromkeys(_HOST_RE.findall(text)))
+
+
+class DomainBlocklist:
+    """Blocked domains indexed for per-host lookups in microseconds.
+
+    Entries come in three forms:
+
+    - ``bit.ly``         the domain and every subdomain (reversed-label trie)
+    - ``discord-*``      any host label starting with ``discord-``
+    - ``discordnitro.*`` that label under any suffix (``discordnitro.gift``)
+    """
+
+    def __init__(self, entries):
+        self.entries = tuple(dict.fromkeys(e.strip().lower() for e in entries if e.strip()))
+        self._suffixes = {}
+        self._prefixes = {}
+        self._names = {}
+
+        for entry in self.entries:
+            if entry.endswith(".*"):
+                self._names[entry[:-2]] = entry
+            elif entry.endswith("*"):
+                node = self._prefixes
+                for ch in entry[:-1]:
+                    node = node.setdefault(ch, {})
+                node[_END] = entry
+            else:
+                node = self._suffixes
+                for label in reversed(entry.split(".")):
+                    node = node.setdefault(label, {})
+                node[_END] = entry
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _match_prefix(self, label):
+        node = self._prefixes
+        for ch in label:
+            node = node.get(ch)
+            if node is None:
+                return None
+            if _END in node:
+                return node[_END]
+        return None
+
+    def match(self, host):
+        """Return the entry blocking ``host``, or ``None``."""
+        labels = host.split(".")
+
+        node = self._suffixes
+        for label in reversed(labels):
+            node = node.get(label)
+            if node is None:
+                break
+            if _END in node:
+                return node[_END]
+
+        names, prefixes = self._names, self._prefixes
+        for label in labels[:-1]:
+            # Labels are also tried leet-folded so "n1tro-" hits "nitro-*".
+            for candidate in {label, fold_leet(label)}:
+                if candidate in names:
+                    return names[candidate]
+                if prefixes:
+                    found = self._match_prefix(candidate)
+                    if found:
+                        return found
+        return None
+
+    def search(self, text):
+        """Return the entry blocking any host linked in ``text``, or ``None``."""
+        for host in extract_hosts(text):
+            found = self.match(host)
+            if found:
+                return found
+        return None
+
+
+class ReloadableDomainBlocklist(ReloadableMatcher):
+    """``DomainBlocklist`` kept in sync with a blocklist file."""
+
+    matcher_class = DomainBlocklist
+    kind = "blocked domains"
+
+    def search(self, text):
+        return self.matcher.search(text)
@@ -0,0 +1,69 @@
+# embed_cache.py
+
+import logging
+from types import MappingProxyType
+
+
+class RenderedEmbeds:
+    """One catalog load's embeds, read-only; lives in the catalog snapshot."""
+
+    def __init__(self, cache, entries):
+        self._cache = cache
+        self._entries = MappingProxyType(entries)  # key -> (inputs, embed)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self._cache.misses += 1
+            return None
+        self._cache.hits += 1
+        return entry[1]
+
+
+class EmbedCache:
+    """Pre-rendered embeds for one catalog, keyed by catalog key.
+
+    ``rebuild`` runs with every catalog load and returns a new
+    ``RenderedEmbeds`` for the snapshot, leaving the one in use untouched:
+    entries whose inputs did not change reuse the previous embed, changed
+    or new ones are rendered eagerly. An entry that fails to render is
+    logged and left out, so one bad row cannot fail the whole load.
+    """
+
+    def __init__(self, name, render):
+        self.name = name
+        self.render = render  # render(key, inputs) -> discord.Embed
+        self.hits = 0
+        self.misses = 0
+        self.rendered = 0
+        self.failed = 0
+
+    def rebuild(self, inputs_by_key, previous=None):
+        """Embeds for ``{key: inputs}``, reusing unchanged ones from ``previous``."""
+        old = previous._entries if previous is not None else {}
+        entries = {}
+        for key, inputs in inputs_by_key.items():
+            entry = old.get(key)
+            if entry is None or entry[0] != inputs:
+                try:
+                    entry = (inputs, self.render(key, inputs))
+                except Exception as e:
+                    self.failed += 1
+                    logging.warning(f"Could not render {self.name} embed for {key!r}: {e!r}")
+                    continue
+                self.rendered += 1
+            entries[key] = entry
+        return RenderedEmbeds(self, entries)
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return (
+            f"{self.name}: hit rate {self.hit_rate():.1%} "
+            f"({self.hits} hits, {self.misses} misses, {self.rendered} rendered, {self.failed} failed)"
+        )
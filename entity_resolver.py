@@ -0,0 +1,91 @@
+# entity_resolver.py
+
+import re
+import time
+import asyncio
+from collections import OrderedDict
+
+import discord
+
+_SNOWFLAKE_RE = re.compile(r"^(?:<(?:@!?|#)(\d+)>|(\d+))$")
+
+
+def parse_snowflake(value):
+    """``123``, ``<@123>``, ``<@!123>`` or ``<#123>`` as an int; anything else is ``None``."""
+    match = _SNOWFLAKE_RE.match(str(value or "").strip())
+    if not match:
+        return None
+    return int(match.group(1) or match.group(2))
+
+
+class EntityResolver:
+    """Looks up users and channels: gateway cache, then recent REST results, then REST.
+
+    Objects fetched over REST are kept for ``ttl`` seconds in an LRU of
+    ``max_entries``. Concurrent lookups of the same ID share one request.
+    Unknown IDs resolve to ``None`` and are not cached; other HTTP errors
+    propagate like ``fetch_*`` would.
+    """
+
+    def __init__(self, bot, ttl=600, max_entries=2048):
+        self.bot = bot
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._cache = OrderedDict()  # (kind, id) -> (expires, object)
+        self._inflight = {}          # (kind, id) -> Task
+        self.stats = {"gateway": 0, "cached": 0, "fetched": 0, "shared": 0}
+
+    def _cached(self, key, now):
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return entry[1]
+
+    async def _fetch(self, key, fetch):
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["shared"] += 1
+            return await asyncio.shield(task)
+
+        async def run():
+            try:
+                obj = await fetch(key[1])
+            except discord.NotFound:
+                return None
+            self.stats["fetched"] += 1
+            self._cache[key] = (time.monotonic() + self.ttl, obj)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+            return obj
+
+        task = self._inflight[key] = asyncio.create_task(run())
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _resolve(self, kind, object_id, get, fetch):
+        if object_id is None:
+            return None
+        obj = get(object_id)
+        if obj is not None:
+            self.stats["gateway"] += 1
+            return obj
+        key = (kind, object_id)
+        obj = self._cached(key, time.monotonic())
+        if obj is not None:
+            self.stats["cached"] += 1
+            return obj
+        return await self._fetch(key, fetch)
+
+    async def user(self, user_id):
+        return await self._resolve("user", user_id, self.bot.get_user, self.bot.fetch_user)
+
+    async def channel(self, channel_id):
+        return await self._resolve("channel", channel_id, self.bot.get_channel, self.bot.fetch_channel)
+
+    def forget(self, kind, object_id):
+        self._cache.pop((kind, object_id), None)
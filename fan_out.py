@@ -0,0 +1,88 @@
+# fan_out.py
+
+import re
+import asyncio
+import logging
+
+import discord
+
+from entity_resolver import parse_snowflake
+
+_SEPARATORS_RE = re.compile(r"[\s,;]+")
+
+
+def parse_targets(text):
+    """IDs or mentions separated by spaces, commas or semicolons, deduplicated in order."""
+    ids = (parse_snowflake(part) for part in _SEPARATORS_RE.split(text or "") if part)
+    return list(dict.fromkeys(i for i in ids if i is not None))
+
+
+class FanOutResult:
+    def __init__(self, total):
+        self.total = total
+        self.delivered = []
+        self.forbidden = []
+        self.failed = []
+
+    @property
+    def done(self):
+        return len(self.delivered) + len(self.forbidden) + len(self.failed)
+
+    def progress(self):
+        return (
+            f"📤 {self.done}/{self.total} "
+            f"(✅ {len(self.delivered)} · 🚫 {len(self.forbidden)} · ❌ {len(self.failed)})"
+        )
+
+    def summary(self, mention="<@{}>", limit=20):
+        lines = [
+            f"✅ Delivered: {len(self.delivered)}",
+            f"🚫 Forbidden: {len(self.forbidden)}",
+            f"❌ Failed: {len(self.failed)}",
+        ]
+        for label, ids in (("Forbidden", self.forbidden), ("Failed", self.failed)):
+            if ids:
+                shown = " ".join(mention.format(i) for i in ids[:limit])
+                more = f" +{len(ids) - limit} more" if len(ids) > limit else ""
+                lines.append(f"{label}: {shown}{more}")
+        return "\n".join(lines)
+
+
+async def fan_out(targets, send, concurrency=5, progress=None, progress_interval=2.0):
+    """Call ``send(target)`` for every target with at most ``concurrency`` in flight.
+
+    discord.py waits out 429s per route, so the send finishes as fast as
+    the rate limits allow. ``progress(result)`` is awaited every
+    ``progress_interval`` seconds while running and once at the end.
+    """
+    result = FanOutResult(len(targets))
+    pending = iter(targets)
+
+    async def worker():
+        for target in pending:
+            try:
+                await send(target)
+                result.delivered.append(target)
+            except discord.Forbidden:
+                result.forbidden.append(target)
+            except Exception as e:
+                logging.warning(f"Fan-out to {target} failed: {e}")
+                result.failed.append(target)
+
+    async def report():
+        while True:
+            await asyncio.sleep(progress_interval)
+            try:
+                await progress(result)
+            except discord.HTTPException as e:
+                logging.debug(f"Fan-out progress update failed: {e}")
+
+    reporter = asyncio.create_task(report()) if progress else None
+    try:
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(targets)) or 1)))
+    finally:
+        if reporter:
+            reporter.cancel()
+    if progress:
+        await progress(result)
+    return result
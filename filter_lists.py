@@ -0,0 +1,55 @@
+# filter_lists.py
+
+bad_words = [
+    # NSFW and explicit
+    "free nitro", "free nude", "free nsfw", "nude", "fuck", "sex", "onlyfans",
+    "private video", "click here", "join now", "snapchat nude",
+
+    # Game & giveaway scams (refined to avoid false positives)
+    "free steam", "steam giveaway", "steam gift", "free robux", "free vbucks",
+    "free uc", "nitro drop", "claim nitro", "steam drop", "roblox code",
+    "fortnite free", "cod points free", "valorant points free", "valorant free skin",
+
+    # Suspicious domains / shortened URLs
+    "discordnitro", "discord-airdrop", "steamcommunity", "steampowered",
+    "nft-airdrop", "airdrop claim", "verify here", "free-key", "account-free",
+    "giveaway-bot", "nitro-bot", "claim gift", "verify to claim",
+
+    # Obvious bait / triggers
+    "@everyone free", "@here get", ":gift:", ":tada:", ":gem:", ":moneybag:",
+    "discord.giveaway",  # e.g. discord.giveawayevent.site
+]
+
+# Link hosts are checked against this list instead of raw substrings (see
+# domain_filter.py for the entry forms), so "discord-" in normal text or a
+# repo path no longer trips the filter.
+blocked_domains = [
+    # Shortened URLs
+    "u.to", "bit.ly", "tinyurl.com", "rb.gy", "t.co", "gg.gg",
+
+    "discord-*",         # e.g. discord-airdrop.com
+    "discordnitro.*",    # e.g. discordnitro.gift
+    "discordgift.*",     # e.g. discordgift.codes
+    "d1scord.*",         # typo style (kept as-is: "discord." is the real domain)
+    "discorcl.*",        # fake 'L' instead of 'd'
+
+    "steamcommunity-*",  # e.g. steamcommunity-offer.site
+    "steamgift*",        # e.g. steamgiftdrop.com
+    "steampowered-*",    # e.g. steampowered-bonus.net
+    "steamdrop.*",       # e.g. steamdrop.shop
+    "steamnitro.*",      # steam with nitro bait (also catches steamn1tro.)
+
+    "epicgames-*",       # e.g. epicgames-prize.store
+    "epic-drop.*",       # e.g. epic-drop.gg
+
+    "roblox-*",          # e.g. roblox-reward.tk
+    "fortnite-*",        # e.g. fortnite-code.online
+    "valorant-*",        # e.g. valorant-points.click
+
+    "nitro-*",           # nitro-gift.xyz, nitr0-gift.xyz
+    "airdrop-*",         # airdrop-nitro.store
+    "verify-*",          # verify-nitro.link
+    "login-*",           # login-steam.xyz
+    "secure-*",          # secure-discordlogin.com
+    "giveaway-*",        # giveaway-discord.tech
+]
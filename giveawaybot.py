@@ -10,6 +10,8 @@ import discord
 from discord.ext import commands, tasks
 from discord import app_commands
 from datetime import datetime, timedelta, timezone
+from command_sync import sync_if_changed
+from memory_profile import MemoryProfile
 
 SERVER_NAME       = os.getenv("SERVER_NAME", "MyServer")
 TOKEN             = os.getenv("BOT_TOKEN")
@@ -26,7 +28,9 @@ intents = discord.Intents.default()
 intents.message_content = True
 intents.guilds = True
 intents.members = True
-bot = commands.Bot(command_prefix="!", intents=intents)
+# Giveaways only use slash commands and interaction payloads
+memory = MemoryProfile("giveawaybot", intents)
+bot = commands.Bot(command_prefix="!", **memory.options)
 
 tz = pytz.timezone("Asia/Kolkata")
 start_time = datetime.now(tz)
@@ -274,10 +278,12 @@ async def on_ready():
     bot.add_view(view, message_id=None) # The custom_id will handle routing
 
     print(f"✅ Logged in as {bot.user}")
+    memory.report(bot)
     await bot.change_presence(activity=discord.Game(name="Managing Giveaways | Coded by NotTheRealEpic"))
     try:
-        synced = await bot.tree.sync()
-        print(f"🔁 Synced {len(synced)} application command(s).")
+        synced = await sync_if_changed(bot.tree)
+        if synced is not None:
+            print(f"🔁 Synced {len(synced)} application command(s).")
     except Exception as e:
         print(f"⚠️ Slash command sync failed: {e}")
     
@@ -0,0 +1,73 @@
+# image_hash.py
+
+import io
+import asyncio
+import logging
+from collections import OrderedDict
+
+from PIL import Image
+
+MAX_IMAGE_BYTES = 8 * 1024 * 1024  # skip anything bigger than this
+MAX_IMAGES_PER_MESSAGE = 4
+HASH_CACHE_SIZE = 4096
+HASH_SIZE = 8  # 8x8 difference hash -> 64 bits
+MIN_HASH_BITS = 5  # flat images (blank, solid colour, plain gradients) hash to ~all 0s or 1s
+
+_hash_cache = OrderedDict()         # attachment URL -> hash
+_download_slots = asyncio.Semaphore(4)
+
+
+def dhash(data, size=HASH_SIZE):
+    """64-bit difference hash of an encoded image."""
+    with Image.open(io.BytesIO(data)) as img:
+        img.draft("L", (size * 4, size * 4))  # lets JPEG decode at a reduced scale
+        small = img.convert("L").resize((size + 1, size), Image.BILINEAR)
+    pixels = small.tobytes()
+
+    value = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for col in range(size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def is_degenerate(h, size=HASH_SIZE):
+    """Whether a hash carries too little detail to tell unrelated images apart."""
+    bits = h.bit_count()
+    return bits < MIN_HASH_BITS or bits > size * size - MIN_HASH_BITS
+
+
+async def attachment_hashes(message):
+    """Perceptual hashes of the image attachments on ``message``.
+
+    Downloads are size-capped, limited to a few at a time and cached by
+    attachment URL; decoding runs in a worker thread.
+    """
+    hashes = []
+    for attachment in message.attachments[:MAX_IMAGES_PER_MESSAGE]:
+        if not (attachment.content_type or "").startswith("image/"):
+            continue
+        if attachment.size > MAX_IMAGE_BYTES:
+            continue
+
+        url = attachment.url.split("?", 1)[0]  # signed query params vary per fetch
+        h = _hash_cache.get(url)
+        if h is not None:
+            _hash_cache.move_to_end(url)
+            hashes.append(h)
+            continue
+
+        try:
+            async with _download_slots:
+                data = await attachment.read()
+            h = await asyncio.to_thread(dhash, data)
+        except Exception as e:
+            logging.warning(f"Could not hash attachment {attachment.filename}: {e}")
+            continue
+
+        _hash_cache[url] = h
+        if len(_hash_cache) > HASH_CACHE_SIZE:
+            _hash_cache.popitem(last=False)
+        hashes.append(h)
+    return [h for h in hashes if not is_degenerate(h)]
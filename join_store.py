@@ -0,0 +1,118 @@
+# join_store.py
+
+import time
+import sqlite3
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+
+
+class JoinStore:
+    """Recent joins per (guild, member), kept for ``ttl`` seconds and saved to SQLite.
+
+    Only joins young enough to matter for the quick-leave rule are kept:
+    entries sit in join order, so expiry pops from the front, and
+    ``max_entries`` caps a raid. Every change is written through to disk
+    from a worker thread and ``load`` warms the store after a restart.
+    Times are wall-clock epoch seconds so they survive the restart.
+    """
+
+    def __init__(self, path, ttl, max_entries=100_000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (guild_id, user_id) -> [joined, got_role]
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS joins (
+                guild_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                joined REAL NOT NULL,
+                got_role INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (guild_id, user_id)
+            )
+        """)
+        self._conn.commit()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def _write(self, sql, params):
+        with self._lock:
+            self._conn.execute(sql, params)
+            self._conn.commit()
+
+    async def _write_async(self, sql, params):
+        try:
+            await asyncio.to_thread(self._write, sql, params)
+        except sqlite3.Error as e:
+            logging.error(f"Join store write failed: {e}")
+
+    def load(self, now=None):
+        """Drop expired rows and load the rest; used once at startup."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._conn.execute("DELETE FROM joins WHERE joined <= ?", (now - self.ttl,))
+            self._conn.commit()
+            rows = self._conn.execute(
+                "SELECT guild_id, user_id, joined, got_role FROM joins ORDER BY joined"
+            ).fetchall()
+        self._entries = OrderedDict(
+            ((gid, uid), [joined, bool(got_role)]) for gid, uid, joined, got_role in rows
+        )
+        self._evict(now)
+        logging.info(f"📥 Loaded {len(self._entries)} recent joins from {self.path}.")
+
+    def _evict(self, now):
+        cutoff = now - self.ttl
+        dropped = []
+        while self._entries:
+            key, (joined, _) = next(iter(self._entries.items()))
+            if joined > cutoff and len(self._entries) <= self.max_entries:
+                break
+            self._entries.popitem(last=False)
+            dropped.append(key)
+        return dropped
+
+    async def joined(self, guild_id, user_id, now=None):
+        now = time.time() if now is None else now
+        key = (guild_id, user_id)
+        self._entries.pop(key, None)
+        self._entries[key] = [now, False]
+        self._evict(now)
+        await self._write_async(
+            "INSERT OR REPLACE INTO joins (guild_id, user_id, joined, got_role) VALUES (?, ?, ?, 0)",
+            (guild_id, user_id, now),
+        )
+
+    async def mark_role(self, guild_id, user_id):
+        entry = self._entries.get((guild_id, user_id))
+        if entry is None or entry[1]:
+            return
+        entry[1] = True
+        await self._write_async(
+            "UPDATE joins SET got_role = 1 WHERE guild_id = ? AND user_id = ?", (guild_id, user_id)
+        )
+
+    async def pop(self, guild_id, user_id):
+        """Forget a member; returns ``(joined, got_role)`` or ``None``."""
+        entry = self._entries.pop((guild_id, user_id), None)
+        if entry is not None:
+            await self._write_async(
+                "DELETE FROM joins WHERE guild_id = ? AND user_id = ?", (guild_id, user_id)
+            )
+        return entry
+
+    async def sweep(self, now=None):
+        """Expire old joins in memory and on disk; returns how many were dropped."""
+        now = time.time() if now is None else now
+        dropped = self._evict(now)
+        if dropped:
+            await self._write_async("DELETE FROM joins WHERE joined <= ?", (now - self.ttl,))
+        return len(dropped)
@@ -0,0 +1,133 @@
+# memory_profile.py
+#
+# Gateway cache budgets shared by the bots. Pick one with MEMORY_PROFILE
+# (or MEMORY_PROFILE_<BOTNAME> for a single bot):
+#
+#   full     discord.py defaults: every member cached, 1000 messages, chunk on startup
+#   lean     only members who join while online, 100 messages, no chunking, unused intents off
+#   minimal  no member or message cache, no chunking, unused intents off
+
+import os
+import sys
+import logging
+import itertools
+
+import discord
+
+PROFILES = {
+    "full": {"member_cache": "all", "max_messages": 1000, "chunk": True, "trim_intents": False},
+    "lean": {"member_cache": "joined", "max_messages": 100, "chunk": False, "trim_intents": True},
+    "minimal": {"member_cache": "none", "max_messages": None, "chunk": False, "trim_intents": True},
+}
+DEFAULT_PROFILE = "lean"
+
+# Intents that only feed caches or events a bot may not use
+TRIMMABLE_INTENTS = (
+    "members", "presences", "message_content", "typing",
+    "voice_states", "invites", "integrations", "webhooks",
+)
+_MEMBER_CACHE_LEVELS = ("none", "joined", "all")
+SAMPLE_SIZE = 100
+
+
+def approx_size(obj):
+    """Bytes held by ``obj`` itself plus its plain-data attributes.
+
+    Other models it points to (guild, state, ...) are shared and not counted.
+    """
+    size = sys.getsizeof(obj)
+    names = getattr(obj, "__dict__", None) or {}
+    slots = itertools.chain.from_iterable(getattr(cls, "__slots__", ()) for cls in type(obj).__mro__)
+    for name in itertools.chain(names, slots):
+        value = getattr(obj, name, None)
+        if isinstance(value, (str, bytes, int, float, tuple, list, dict, set, frozenset)):
+            size += sys.getsizeof(value)
+    return size
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except (ImportError, OSError):
+        return None
+
+
+class MemoryProfile:
+    """Cache options for one bot, and a startup report of what they cost.
+
+    ``required_intents`` are never trimmed; ``min_member_cache`` is the
+    least member caching the bot's features still work with.
+    """
+
+    def __init__(self, bot_name, intents, required_intents=(), min_member_cache="none"):
+        self.name = (
+            os.getenv(f"MEMORY_PROFILE_{bot_name.upper()}")
+            or os.getenv("MEMORY_PROFILE")
+            or DEFAULT_PROFILE
+        ).lower()
+        if self.name not in PROFILES:
+            logging.warning(f"⚠️ Unknown memory profile {self.name!r}, using {DEFAULT_PROFILE!r}.")
+            self.name = DEFAULT_PROFILE
+        settings = PROFILES[self.name]
+
+        if settings["trim_intents"]:
+            for flag in TRIMMABLE_INTENTS:
+                if flag not in required_intents:
+                    setattr(intents, flag, False)
+
+        level = max(
+            _MEMBER_CACHE_LEVELS.index(settings["member_cache"]),
+            _MEMBER_CACHE_LEVELS.index(min_member_cache),
+        )
+        self.member_cache = _MEMBER_CACHE_LEVELS[level]
+        if self.member_cache == "all":
+            flags = discord.MemberCacheFlags.from_intents(intents)
+        else:
+            flags = discord.MemberCacheFlags.none()
+            if self.member_cache == "joined" and intents.members:
+                flags.joined = True
+
+        self.options = {
+            "intents": intents,
+            "member_cache_flags": flags,
+            "max_messages": settings["max_messages"],
+            "chunk_guilds_at_startup": settings["chunk"] and intents.members,
+        }
+
+    def report(self, bot):
+        """Log the profile, entity counts and estimated bytes per entity."""
+        enabled = ", ".join(name for name, on in self.options["intents"] if on)
+        logging.info(
+            f"🧠 Memory profile {self.name!r}: member cache {self.member_cache}, "
+            f"max_messages {self.options['max_messages']}, "
+            f"chunking {'on' if self.options['chunk_guilds_at_startup'] else 'off'}; intents: {enabled}"
+        )
+
+        collections = {
+            "guilds": lambda: bot.guilds,
+            "channels": bot.get_all_channels,
+            "members": bot.get_all_members,
+            "users": lambda: bot.users,
+            "messages": lambda: bot.cached_messages,
+            "roles": lambda: (r for g in bot.guilds for r in g.roles),
+            "emojis": lambda: bot.emojis,
+        }
+        lines, total = [], 0
+        for label, items in collections.items():
+            count = sum(1 for _ in items())
+            sample = list(itertools.islice(items(), SAMPLE_SIZE))
+            each = sum(map(approx_size, sample)) // len(sample) if sample else 0
+            total += each * count
+            lines.append(f"{label}={count} (~{each} B each)")
+
+        rss = rss_bytes()
+        rss_text = f", RSS {rss / 2**20:.1f} MiB" if rss else ""
+        logging.info(f"🧠 Cache: {', '.join(lines)}; ~{total / 2**20:.2f} MiB in entities{rss_text}")
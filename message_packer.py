@@ -0,0 +1,81 @@
+# message_packer.py
+
+MESSAGE_LIMIT = 2000  # Discord's per-message character limit
+PART_ORDER = ("FIRST", "SEC", "THIRD", "FOUR")
+FENCE = "```"
+
+
+def split_blocks(text):
+    """Split markdown into blocks at blank lines, keeping code fences whole."""
+    blocks, current, in_fence = [], [], False
+    for line in text.strip().splitlines():
+        line = line.rstrip()
+        if line.lstrip().startswith(FENCE):
+            in_fence = not in_fence
+        if not line and not in_fence:
+            if current:
+                blocks.append("\n".join(current))
+                current = []
+            continue
+        current.append(line)
+    if current:
+        blocks.append("\n".join(current))
+    return blocks
+
+
+def _split_oversized(block, limit):
+    """Break a block longer than ``limit`` at line breaks, re-opening code fences."""
+    pieces, current, fence = [], "", None
+    width = limit - 2 * len(FENCE) - 40  # room to re-open and close a fence
+    lines = []
+    for line in block.split("\n"):
+        # No line break to split at: cut the line itself
+        lines += [line[i:i + width] for i in range(0, len(line), width)] or [""]
+    for line in lines:
+        stripped = line.lstrip()
+        after = fence
+        if stripped.startswith(FENCE):
+            after = None if fence is not None else stripped[:16]
+        # A piece that ends inside a fence still needs room to close it
+        reserve = len(FENCE) + 1 if after is not None else 0
+        candidate = f"{current}\n{line}" if current else line
+        if current and len(candidate) + reserve > limit:
+            pieces.append(current + (f"\n{FENCE}" if fence is not None else ""))
+            candidate = f"{fence}\n{line}" if fence is not None else line
+        current = candidate
+        fence = after
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def pack_messages(texts, limit=MESSAGE_LIMIT):
+    """Pack texts into the fewest messages of at most ``limit`` characters.
+
+    Blocks are laid out in order and greedily merged, so a message only
+    ends where a new block would not fit. Blocks that are too long on their
+    own are split at line breaks.
+    """
+    messages, current = [], ""
+    for text in texts:
+        if not text or not text.strip():
+            continue
+        for block in split_blocks(text):
+            for piece in (_split_oversized(block, limit) if len(block) > limit else [block]):
+                if current and len(current) + 2 + len(piece) <= limit:
+                    current = f"{current}\n\n{piece}"
+                else:
+                    if current:
+                        messages.append(current)
+                    current = piece
+    if current:
+        messages.append(current)
+    return messages
+
+
+def plan_pro_files(pro_files, limit=MESSAGE_LIMIT):
+    """Chunk plan for every /proinfo page: ``{fid: [message, ...]}``."""
+    return {
+        fid: pack_messages([data.get(part, "") for part in PART_ORDER], limit)
+        for fid, data in pro_files.items()
+    }
@@ -4,8 +4,6 @@ import time
 import random
 import logging
 import re
-import unicodedata
-from collections import defaultdict
 from discord import app_commands, Interaction
 from datetime import datetime, timedelta
 from threading import Thread
@@ -15,11 +13,32 @@ from discord.ext import commands, tasks
 from discord import app_commands, Embed
 
 
-# Your imported data modules (make sure these are correct)
-from files import files_data
-from pro_file_info import pro_file_info
-from paid_id import paid_id_data
-from licence import license_descriptions
+# Catalog data lives in catalog.db (seeded from files.py, licence.py,
+# paid_id.py and pro_file_info.py on first run)
+from catalog_store import CatalogStore
+from filter_lists import bad_words, blocked_domains
+from word_filter import ReloadableMatcher, normalize_text
+from domain_filter import ReloadableDomainBlocklist
+from spam_tracker import UserMessageTracker, ContentIndex, NearDuplicateIndex, ImageHashIndex, content_hash
+from spam_tracker import CROSS_ACCOUNT_MIN_LENGTH, CROSS_ACCOUNT_MIN_GUILDS, CROSS_ACCOUNT_MIN_USERS
+from image_hash import attachment_hashes
+from spam_purge import SpamPurger
+from autocomplete_index import AutocompleteIndex
+from code_registry import CodeRegistry
+from paid_id_index import PaidIdIndex, normalize_discord_id, parse_date
+from embed_cache import EmbedCache
+from message_packer import plan_pro_files
+from command_sync import sync_if_changed
+from verification_queue import VerificationQueue
+from join_store import JoinStore
+from dm_outbox import DMOutbox
+from raid_detector import RaidDetector, RaidResponder
+from entity_resolver import EntityResolver, parse_snowflake
+from fan_out import fan_out, parse_targets
+from audit_log import AuditLog
+from memory_profile import MemoryProfile
+from spam_state import LocalSpamState, SqliteSpamState
+from sharding import ShardStats, auto_shard_enabled, is_primary, shard_options
 
 # ----------- Setup Logging (Better than print for production) -----------
 
@@ -63,69 +82,40 @@ statuses = [
     "Less talk, more fixing.",
 ]
 
-user_activity = {}
 TARGET_ROLE_NAME = "LEGIT"
 BAN_DURATION_DAYS = 30
 TIME_LIMIT_MINUTES = 180
+join_store = JoinStore(os.getenv("JOIN_DB", "joins.db"), ttl=TIME_LIMIT_MINUTES * 60)
 
-user_message_tracker = defaultdict(list)
-
-def normalize_text(text):
-    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii').lower()
-
-bad_words = [
-    # NSFW and explicit
-    "free nitro", "free nude", "free nsfw", "nude", "fuck", "sex", "onlyfans",
-    "private video", "click here", "join now", "snapchat nude",
-
-    # Game & giveaway scams (refined to avoid false positives)
-    "free steam", "steam giveaway", "steam gift", "free robux", "free vbucks",
-    "free uc", "nitro drop", "claim nitro", "steam drop", "roblox code",
-    "fortnite free", "cod points free", "valorant points free", "valorant free skin",
-
-    # Suspicious domains / shortened URLs
-    "discordnitro", "discord-airdrop", "steamcommunity", "steampowered",
-    "nft-airdrop", "airdrop claim", "verify here", "free-key", "account-free",
-    "giveaway-bot", "nitro-bot", "claim gift", "verify to claim",
-
-    # Obvious bait / triggers
-    "@everyone free", "@here get", ":gift:", ":tada:", ":gem:", ":moneybag:",
-    "u.to/", "bit.ly/", "tinyurl.com/", "rb.gy/", "t.co/", "gg.gg/",
-    "discord-",          # e.g. discord-airdrop.com
-    "discordnitro.",     # e.g. discordnitro.gift
-    "discord.giveaway",  # e.g. discord.giveawayevent.site
-    "discordgift.",      # e.g. discordgift.codes
-    "d1scord.",          # typo style
-    "discorcl.",         # fake 'L' instead of 'd'
-
-    "steamcommunity-",   # e.g. steamcommunity-offer.site
-    "steamgift.",        # e.g. steamgiftdrop.com
-    "steampowered-",     # e.g. steampowered-bonus.net
-    "steamdrop.",        # e.g. steamdrop.shop
-    "steamn1tro.",       # steam with nitro bait
-
-    "epicgames-",        # e.g. epicgames-prize.store
-    "epic-drop.",        # e.g. epic-drop.gg
-
-    "roblox-",           # e.g. roblox-reward.tk
-    "fortnite-",         # e.g. fortnite-code.online
-    "valorant-",         # e.g. valorant-points.click
-
-    "nitro-",            # nitro-gift.xyz
-    "nitr0-",            # using zero
-    "airdrop-",          # airdrop-nitro.store
-    "verify-",           # verify-nitro.link
-    "login-",            # login-steam.xyz
-    "secure-",           # secure-discordlogin.com
-    "giveaway-",         # giveaway-discord.tech
-]
+user_message_tracker = UserMessageTracker()
+content_index = ContentIndex()
+near_duplicate_index = NearDuplicateIndex()
+image_hash_index = ImageHashIndex()
+
+# Exact-hash counts are shared across processes when shards are split
+# (SPAM_STATE_DB); the near-duplicate and image indexes stay per process.
+if os.getenv("SPAM_STATE_DB"):
+    spam_state = SqliteSpamState(os.getenv("SPAM_STATE_DB"))
+else:
+    spam_state = LocalSpamState(user_message_tracker, content_index)
+
+# Drop a bad_words.txt next to the bot (one entry per line) to override the
+# list in filter_lists.py; it is picked up by reload_bad_words without a restart.
+BAD_WORDS_FILE = "bad_words.txt"
+bad_word_matcher = ReloadableMatcher(BAD_WORDS_FILE, bad_words)
+
+# Same for blocked_domains.txt; it can hold tens of thousands of entries.
+BLOCKED_DOMAINS_FILE = "blocked_domains.txt"
+blocked_domain_matcher = ReloadableDomainBlocklist(BLOCKED_DOMAINS_FILE, blocked_domains)
 
 
 
 # ----------- Cooldown Check to Avoid Rapid Restarts -----------
 
 def check_restart_limit():
-    path = "last_restart.txt"
+    # Shard processes started side by side (SHARD_IDS) each keep their own cooldown
+    shard_ids = shard_options().get("shard_ids")
+    path = f"last_restart.{'-'.join(map(str, shard_ids))}.txt" if shard_ids else "last_restart.txt"
     current_time = time.time()
 
     if os.path.exists(path):
@@ -143,17 +133,13 @@ check_restart_limit()
 
 # ----------- Utility Functions -----------
 
-def generate_code():
-    """Generate unique 8-char alphanumeric code like epic0001."""
-    random_number = random.randint(1, 9999)
-    return f"epic{random_number:04d}"
-
-def check_code_exists(code: str) -> bool:
-    if os.path.exists("generated_codes.txt"):
-        with open("generated_codes.txt", "r") as file:
-            codes = [line.strip() for line in file.readlines()]
-            return code in codes
-    return False
+# Loaded once; /code allocates from memory and appends to the log
+code_registry = CodeRegistry("generated_codes.txt")
+
+# /pass, /paid_id and /proinfo read from this; edits to catalog.db are
+# picked up by reload_catalog without a restart
+catalog = CatalogStore(os.getenv("CATALOG_DB", "catalog.db"))
+
 # --- CONFIG ---  
 LEGIT_REACTION_CHANNEL_ID = 1233843778754838679  # Channel where embed will be sent
 LEGIT_REACTION_ROLE_ID = 1232213167480901713  # Role to give on reaction
@@ -168,8 +154,33 @@ intents.message_content = True  # Required for commands reading message content
 intents.guilds = True
 intents.members = True
 intents.reactions = True
-bot = commands.Bot(command_prefix="!", intents=intents)
+# Moderation needs message content and member join/leave events; the
+# quick-leave rule needs members who joined while online to stay cached.
+memory = MemoryProfile(
+    "nottherealepic", intents,
+    required_intents=("members", "message_content"), min_member_cache="joined"
+)
+if auto_shard_enabled():
+    bot = commands.AutoShardedBot(command_prefix="!", **memory.options, **shard_options())
+else:
+    bot = commands.Bot(command_prefix="!", **memory.options)
 tree = bot.tree
+shard_stats = ShardStats(bot)
+spam_purger = SpamPurger(bot)
+audit_log = AuditLog(os.getenv("AUDIT_DB", "audit.db"))
+raid_detector = RaidDetector()
+raid_responder = RaidResponder(
+    bot, spam_purger, action=os.getenv("RAID_ACTION", "timeout"), timeout_duration=timedelta(hours=24),
+    audit_log=audit_log
+)
+resolver = EntityResolver(bot)
+dm_outbox = DMOutbox(resolver, raid_detector)
+verification_queue = VerificationQueue(
+    bot, LEGIT_REACTION_CHANNEL_ID, LEGIT_REACTION_MESSAGE_ID, LEGIT_REACTION_EMOJI, LEGIT_REACTION_ROLE_ID,
+    audit_log=audit_log,
+    # Member updates only arrive for cached members; record the grant here too
+    on_verified=lambda member: join_store.mark_role(member.guild.id, member.id)
+)
 
 # ----------- Uptime Tracking -----------
 
@@ -183,26 +194,62 @@ status_message_id = None
 
 # ----------- Autocomplete Functions -----------
 
+# Rebuilt with every catalog load so each keystroke skips the full key scan
+catalog.add_view("files_index", lambda tables: AutocompleteIndex(tables["files"]))
+catalog.add_view("paid_ids_index", lambda tables: AutocompleteIndex(tables["paid_ids"]))
+catalog.add_view("pro_files_index", lambda tables: AutocompleteIndex(tables["pro_files"]))
+catalog.add_view("paid_ids_lookup", lambda tables: PaidIdIndex(tables["paid_ids"]))
+
 async def model_autocomplete(interaction: discord.Interaction, current: str):
-    choices = [
-        app_commands.Choice(name=model, value=model)
-        for model in files_data if current.lower() in model.lower()
-    ][:25]
-    return choices
+    return [app_commands.Choice(name=model, value=model) for model in catalog.view("files_index").search(current)]
 
 async def code_autocomplete(interaction: discord.Interaction, current: str):
-    choices = [
-        app_commands.Choice(name=code, value=code)
-        for code in paid_id_data if current.lower() in code.lower()
-    ][:25]
-    return choices
+    return [app_commands.Choice(name=code, value=code) for code in catalog.view("paid_ids_index").search(current)]
 
 async def fid_autocomplete(interaction: discord.Interaction, current: str):
-    choices = [
-        app_commands.Choice(name=fid, value=fid)
-        for fid in pro_file_info if current.lower() in fid.lower()
-    ][:25]
-    return choices
+    return [app_commands.Choice(name=fid, value=fid) for fid in catalog.view("pro_files_index").search(current)]
+
+# ----------- Pre-rendered Embeds -----------
+
+def license_description(tables, data):
+    return tables["licenses"].get(data.get("license"), "No description available.")
+
+def render_pass_embed(modelname, inputs):
+    data, license_desc = inputs
+    embed = Embed(title=f"Access: {modelname}", color=0x2ecc71)
+    embed.add_field(name="```|``` FILE NAME", value=f"```{modelname}```", inline=False)
+    embed.add_field(name="```|``` FILE SIZE", value=f"```{data.get('size', '-')}```", inline=True)
+    embed.add_field(name="```|``` VERSION", value=f"```{data.get('version', '-')}```", inline=True)
+    embed.add_field(name="```|``` FOR", value=f"```{data.get('for', '-')}```", inline=True)
+    embed.add_field(name="```|``` LAST UPDATE", value=f"```{data.get('last_update', '-')}```", inline=True)
+    embed.add_field(name="```|``` LICENSE", value=f"```{data.get('license', '-')}```", inline=True)
+    embed.add_field(name="```|``` LICENSE DETAILS", value=f"```{license_desc}```", inline=False)
+    embed.add_field(name="```|``` PASSWORD", value=f"```{data.get('password', '-')}```", inline=False)
+    return embed
+
+def render_paid_id_embed(code, data):
+    embed = Embed(title=f"Access: {code}", color=0x2ecc71)
+    embed.add_field(name="```|``` DISCORD ID", value=f"```{data.get('Discord_id', '-')}```", inline=False)
+    embed.add_field(name="```|``` FILE NAME", value=f"```{data.get('File_Name', '-')}```", inline=False)
+    embed.add_field(name="```|``` FOR", value=f"```{data.get('For_', '-')}```", inline=True)
+    embed.add_field(name="```|``` DATE", value=f"```{data.get('Date', '-')}```", inline=True)
+    embed.add_field(name="```|``` EMAIL", value=f"```{data.get('Email', '-')}```", inline=False)
+    embed.add_field(name="```|``` PAYMENT VIA", value=f"```{data.get('Via', '-')}```", inline=True)
+    embed.add_field(name="```|``` OTHER CODE", value=f"```{data.get('Othr', '-')}```", inline=True)
+    return embed
+
+# Rendered when the catalog loads; unchanged entries reuse the embed from
+# the snapshot in use, which is only replaced when the new one is swapped in
+pass_embeds = EmbedCache("pass", render_pass_embed)
+paid_id_embeds = EmbedCache("paid_id", render_paid_id_embed)
+catalog.add_view("pass_embeds", lambda tables: pass_embeds.rebuild(
+    {name: (data, license_description(tables, data)) for name, data in tables["files"].items()},
+    previous=catalog.snapshot.views.get("pass_embeds")
+))
+catalog.add_view("paid_id_embeds", lambda tables: paid_id_embeds.rebuild(
+    tables["paid_ids"], previous=catalog.snapshot.views.get("paid_id_embeds")
+))
+catalog.add_view("pro_file_messages", lambda tables: plan_pro_files(tables["pro_files"]))
 
 # ----------- Commands -----------
 
@@ -216,22 +263,15 @@ async def fid_autocomplete(interaction: discord.Interaction, current: str):
 @app_commands.checks.has_role("LEGIT")
 @app_commands.checks.cooldown(1, 10.0, key=lambda i: i.user.id)
 async def pass_command(interaction: discord.Interaction, modelname: str):
-    if modelname not in files_data:
+    snapshot = catalog.snapshot
+    if modelname not in snapshot["files"]:
         await interaction.response.send_message("Model not found!", ephemeral=True)
         return
 
-    data = files_data[modelname]
-    license_desc = license_descriptions.get(data["license"], "No description available.")
-
-    embed = Embed(title=f"Access: {modelname}", color=0x2ecc71)
-    embed.add_field(name="```|``` FILE NAME", value=f"```{modelname}```", inline=False)
-    embed.add_field(name="```|``` FILE SIZE", value=f"```{data['size']}```", inline=True)
-    embed.add_field(name="```|``` VERSION", value=f"```{data['version']}```", inline=True)
-    embed.add_field(name="```|``` FOR", value=f"```{data['for']}```", inline=True)
-    embed.add_field(name="```|``` LAST UPDATE", value=f"```{data['last_update']}```", inline=True)
-    embed.add_field(name="```|``` LICENSE", value=f"```{data['license']}```", inline=True)
-    embed.add_field(name="```|``` LICENSE DETAILS", value=f"```{license_desc}```", inline=False)
-    embed.add_field(name="```|``` PASSWORD", value=f"```{data['password']}```", inline=False)
+    embed = snapshot.views["pass_embeds"].get(modelname)
+    if embed is None:  # entry failed to render at load time
+        data = snapshot["files"][modelname]
+        embed = render_pass_embed(modelname, (data, license_description(snapshot, data)))
 
     await interaction.response.send_message(embed=embed, ephemeral=True)
 
@@ -254,24 +294,13 @@ async def pass_command_error(interaction: discord.Interaction, error):
 @app_commands.checks.cooldown(1, 10.0, key=lambda i: i.user.id)
 async def code_command(interaction: discord.Interaction):
     await interaction.response.defer(thinking=True)
-    new_code = None
-    for _ in range(100):
-        candidate = generate_code()
-        if not check_code_exists(candidate):
-            new_code = candidate
-            break
+    new_code = await code_registry.allocate()
 
     if new_code is None:
         await interaction.followup.send("Failed to generate a unique code. Try again later.")
         return
 
-    if not os.path.exists("generated_codes.txt"):
-        with open("generated_codes.txt", "w"): pass
-
-    with open("generated_codes.txt", "a") as f:
-        f.write(f"{new_code}\n")
-
-    logging.info(f"Code generated and saved: {new_code}")
+    logging.info(f"Code generated and saved: {new_code} ({code_registry.remaining} left)")
     await interaction.followup.send(f"Generated Code: {new_code}")
 
 @code_command.error
@@ -296,20 +325,13 @@ async def paid_id_command(interaction: discord.Interaction, code: str):
     try:
         await interaction.response.defer(thinking=True)
 
-        if code not in paid_id_data:
+        snapshot = catalog.snapshot
+        paid_ids = snapshot["paid_ids"]
+        if code not in paid_ids:
             await interaction.edit_original_response(content="Code not found")
             return
 
-        data = paid_id_data[code]
-
-        embed = Embed(title=f"Access: {code}", color=0x2ecc71)
-        embed.add_field(name="```|``` DISCORD ID", value=f"```{data['Discord_id']}```", inline=False)
-        embed.add_field(name="```|``` FILE NAME", value=f"```{data['File_Name']}```", inline=False)
-        embed.add_field(name="```|``` FOR", value=f"```{data['For_']}```", inline=True)
-        embed.add_field(name="```|``` DATE", value=f"```{data['Date']}```", inline=True)
-        embed.add_field(name="```|``` EMAIL", value=f"```{data['Email']}```", inline=False)
-        embed.add_field(name="```|``` PAYMENT VIA", value=f"```{data['Via']}```", inline=True)
-        embed.add_field(name="```|``` OTHER CODE", value=f"```{data['Othr']}```", inline=True)
+        embed = snapshot.views["paid_id_embeds"].get(code) or render_paid_id_embed(code, paid_ids[code])
 
         await interaction.edit_original_response(embed=embed)
 
@@ -324,6 +346,67 @@ async def paid_id_error(interaction: discord.Interaction, error):
     else:
         logging.error(f"Error in paid_id_command: {error}")
 
+@tree.command(
+    name="paid_lookup",
+    description="Find purchases by Discord ID, email, other code, file or date",
+    guild=discord.Object(id=1232208366735196283)
+)
+@app_commands.default_permissions(administrator=True)
+@app_commands.checks.has_role("ROOT")
+@app_commands.describe(
+    discord_id="Buyer's Discord ID or mention",
+    email="Buyer's email",
+    other_code="Other code (Othr)",
+    file_name="File name",
+    date_from="From date (DD-MM-YYYY)",
+    date_to="To date (DD-MM-YYYY)"
+)
+@app_commands.checks.cooldown(1, 5.0, key=lambda i: i.user.id)
+async def paid_lookup_command(
+    interaction: discord.Interaction,
+    discord_id: str = None,
+    email: str = None,
+    other_code: str = None,
+    file_name: str = None,
+    date_from: str = None,
+    date_to: str = None
+):
+    user_key = normalize_discord_id(discord_id) if discord_id else None
+    start = parse_date(date_from) if date_from else None
+    end = parse_date(date_to) if date_to else None
+    if (discord_id and user_key is None) or (date_from and not start) or (date_to and not end):
+        await interaction.response.send_message(
+            "❌ Use a numeric ID or mention, and dates as DD-MM-YYYY.", ephemeral=True
+        )
+        return
+
+    snapshot = catalog.snapshot
+    codes = snapshot.views["paid_ids_lookup"].search(user_key, email, other_code, file_name, start, end)
+    if codes is None:
+        await interaction.response.send_message("Give at least one field to search by.", ephemeral=True)
+        return
+    if not codes:
+        await interaction.response.send_message("No purchases found.", ephemeral=True)
+        return
+
+    paid_ids = snapshot["paid_ids"]
+    lines = [
+        f"`{code}` {paid_ids[code].get('File_Name', '?')} • {paid_ids[code].get('Date', '?')} • "
+        f"{paid_ids[code].get('Discord_id', '?')} • {paid_ids[code].get('Email', '-')}"
+        for code in codes[:25]
+    ]
+    embed = Embed(title=f"Purchases found: {len(codes)}", description="\n".join(lines), color=0x2ecc71)
+    if len(codes) > 25:
+        embed.set_footer(text=f"Showing first 25 of {len(codes)}. Narrow the search to see more.")
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+@paid_lookup_command.error
+async def paid_lookup_error(interaction: discord.Interaction, error):
+    if isinstance(error, app_commands.errors.MissingRole):
+        await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
+    else:
+        logging.error(f"Error in paid_lookup_command: {error}")
+
 @tree.command(
     name="proinfo",
     description="Get info about paid files",
@@ -344,34 +427,20 @@ async def proinfo_command(interaction: discord.Interaction, fid: str):
             return
 
         # Check if file exists
-        if fid not in pro_file_info:
+        pro_files = catalog["pro_files"]
+        if fid not in pro_files:
             await interaction.response.send_message(
                 "❌ File not found in database!",
                 ephemeral=True
             )
             return
 
-        # Get the file data
-        data = pro_file_info[fid]
+        # Chunk plan is packed when the catalog loads
+        messages = catalog.view("pro_file_messages").get(fid) or plan_pro_files({fid: pro_files[fid]})[fid]
 
-        # Send each part sequentially but as separate messages
         await interaction.response.defer(ephemeral=True)  # Initial defer
-        
-        # Send FIRST if exists
-        if 'FIRST' in data and data['FIRST']:
-            await interaction.followup.send(data['FIRST'], ephemeral=False)
-        
-        # Send SEC if exists
-        if 'SEC' in data and data['SEC']:
-            await interaction.followup.send(data['SEC'], ephemeral=False)
-        
-        # Send THIRD if exists
-        if 'THIRD' in data and data['THIRD']:
-            await interaction.followup.send(data['THIRD'], ephemeral=False)
-        
-        # Send FOUR if exists
-        if 'FOUR' in data and data['FOUR']:
-            await interaction.followup.send(data['FOUR'], ephemeral=False)
+        for content in messages:
+            await interaction.followup.send(content, ephemeral=False)
 
     except Exception as e:
         logging.error(f"Error in /proinfo: {str(e)}")
@@ -393,7 +462,7 @@ async def proinfo_command(interaction: discord.Interaction, fid: str):
 @app_commands.checks.cooldown(1, 5.0, key=lambda i: i.user.id)
 async def spread(interaction: discord.Interaction, channel_id: str, message: str):
     try:
-        channel = bot.get_channel(int(channel_id))
+        channel = await resolver.channel(parse_snowflake(channel_id))
         if channel:
             await channel.send(message)
             await interaction.response.send_message(f"✅ Message sent to {channel.mention}", ephemeral=True)
@@ -425,7 +494,7 @@ async def epicembed(
     color: str = "#3498db"
 ):
     try:
-        channel = bot.get_channel(int(channel_id))
+        channel = await resolver.channel(parse_snowflake(channel_id))
         if not channel:
             await interaction.response.send_message("❌ Channel not found.", ephemeral=True)
             return
@@ -460,8 +529,10 @@ async def epicembed(
 @app_commands.checks.cooldown(1, 10.0, key=lambda i: i.user.id)
 async def paymentxx(interaction: Interaction, channelid: str, userid: str, spawncode: str):
     try:
-        target_channel = await interaction.client.fetch_channel(int(channelid))
-        buyer = await interaction.client.fetch_user(int(userid))
+        target_channel = await resolver.channel(parse_snowflake(channelid))
+        buyer = await resolver.user(parse_snowflake(userid))
+        if not target_channel or not buyer:
+            raise ValueError("channel or user not found")
 
         message = (
             f"{buyer.mention}\n"
@@ -519,8 +590,10 @@ async def warntt(interaction: Interaction, channelid: str, userid: str):
     try:
         await interaction.response.defer(ephemeral=True)
 
-        target_channel = await interaction.client.fetch_channel(int(channelid))
-        buyer = await interaction.client.fetch_user(int(userid))
+        target_channel = await resolver.channel(parse_snowflake(channelid))
+        buyer = await resolver.user(parse_snowflake(userid))
+        if not target_channel or not buyer:
+            raise ValueError("channel or user not found")
 
         message = (
             f"## Ticket Inactivity Warning\n"
@@ -625,7 +698,9 @@ def is_admin_or_mod(interaction: discord.Interaction):
 async def dm(interaction: discord.Interaction, userid: str, message: str):
     await interaction.response.defer(ephemeral=True)
     try:
-        user = await bot.fetch_user(int(userid))
+        user = await resolver.user(parse_snowflake(userid))
+        if not user:
+            raise ValueError("user not found")
         text = message.replace("\\n", "\n")
         await user.send(text)
         await interaction.followup.send(f"✅ DM sent to <@{userid}>.")
@@ -638,6 +713,101 @@ async def dm_error(interaction: discord.Interaction, error):
     if isinstance(error, app_commands.CheckFailure):
         await interaction.response.send_message("❌ You don't have permission.", ephemeral=True)
 
+# ✅ Slash command: /dm_bulk
+@bot.tree.command(
+    name="dm_bulk",
+    description="Send a DM to many users by ID and/or role",
+    guilds=[discord.Object(id=1232208366735196283)]
+)
+@app_commands.check(is_admin_or_mod)
+@app_commands.describe(
+    message="Message (use \\n for newlines)",
+    userids="User IDs or mentions, separated by spaces or commas",
+    role="Also DM every member with this role"
+)
+@app_commands.checks.cooldown(1, 30.0, key=lambda i: i.user.id)
+async def dm_bulk(interaction: discord.Interaction, message: str, userids: str = None, role: discord.Role = None):
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    targets = parse_targets(userids)
+    if role:
+        if role.guild.chunked:
+            holders = [m.id for m in role.members if not m.bot]
+        else:
+            # Member cache is trimmed; list the guild over REST without caching it
+            holders = [m.id async for m in role.guild.fetch_members(limit=None) if role in m.roles and not m.bot]
+        targets = list(dict.fromkeys(targets + holders))
+    if not targets:
+        await interaction.edit_original_response(content="❌ Give user IDs or a role.")
+        return
+
+    await interaction.edit_original_response(content=f"📤 Sending to {len(targets)} users...")
+    text = message.replace("\\n", "\n")
+
+    async def send(user_id):
+        user = await resolver.user(user_id)
+        if not user:
+            raise ValueError("user not found")
+        await user.send(text)
+
+    async def progress(result):
+        await interaction.edit_original_response(content=result.progress())
+
+    result = await fan_out(targets, send, progress=progress)
+    await interaction.edit_original_response(content=result.summary())
+    logging.info(f"/dm_bulk by {interaction.user}: {result.progress()}")
+
+@dm_bulk.error
+async def dm_bulk_error(interaction: discord.Interaction, error):
+    if isinstance(error, app_commands.CommandOnCooldown):  # subclass of CheckFailure
+        await interaction.response.send_message(
+            f"Slow down! Try again in {error.retry_after:.2f} seconds.", ephemeral=True
+        )
+    elif isinstance(error, app_commands.CheckFailure):
+        await interaction.response.send_message("❌ You don't have permission.", ephemeral=True)
+    else:
+        logging.error(f"Error in /dm_bulk: {error}")
+
+@tree.command(
+    name="spread_bulk",
+    description="Send a message to many channels by ID",
+    guild=discord.Object(id=1232208366735196283)
+)
+@app_commands.describe(channel_ids="Channel IDs or mentions, separated by spaces or commas", message="Message to send")
+@app_commands.default_permissions(administrator=True)
+@app_commands.checks.has_role("ROOT")
+@app_commands.checks.cooldown(1, 30.0, key=lambda i: i.user.id)
+async def spread_bulk(interaction: discord.Interaction, channel_ids: str, message: str):
+    targets = parse_targets(channel_ids)
+    if not targets:
+        await interaction.response.send_message("❌ Give at least one channel ID.", ephemeral=True)
+        return
+
+    await interaction.response.send_message(f"📤 Sending to {len(targets)} channels...", ephemeral=True)
+
+    async def send(channel_id):
+        channel = await resolver.channel(channel_id)
+        if not channel:
+            raise ValueError("channel not found")
+        await channel.send(message)
+
+    async def progress(result):
+        await interaction.edit_original_response(content=result.progress())
+
+    result = await fan_out(targets, send, progress=progress)
+    await interaction.edit_original_response(content=result.summary(mention="<#{}>"))
+    logging.info(f"/spread_bulk by {interaction.user}: {result.progress()}")
+
+@spread_bulk.error
+async def spread_bulk_error(interaction: discord.Interaction, error):
+    if isinstance(error, app_commands.CommandOnCooldown):
+        await interaction.response.send_message(
+            f"Slow down! Try again in {error.retry_after:.2f} seconds.", ephemeral=True
+        )
+    elif isinstance(error, app_commands.errors.MissingRole):
+        await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
+    else:
+        logging.error(f"Error in /spread_bulk: {error}")
+
 # ----------- Events -----------
 
 
@@ -646,41 +816,112 @@ async def on_message(message):
     if message.author.bot:
         return
 
-    now = datetime.utcnow()
+    started = time.perf_counter()
+    shard_stats.count(message.guild.id if message.guild else None)
     norm_content = normalize_text(message.content)
 
-    # Track per-user message data
-    user_id = message.author.id
-    user_message_tracker[user_id].append((norm_content, now, message.guild.id))
+    content_key = content_hash(norm_content)
 
-    # Keep only recent messages (last 10 mins)
-    user_message_tracker[user_id] = [
-        (msg, t, gid) for msg, t, gid in user_message_tracker[user_id]
-        if now - t < timedelta(minutes=10)
-    ]
-
-    # Multi-server spam check
-    same_msg_count = sum(1 for msg, _, _ in user_message_tracker[user_id] if msg == norm_content)
-    unique_guilds = {gid for msg, _, gid in user_message_tracker[user_id] if msg == norm_content}
+    # Per-user count of servers this hit (last 10 mins), and the same payload
+    # pushed by several accounts across our servers. Image- or sticker-only
+    # messages have no text and would all share one key, so skip those.
+    unique_guilds = index_guilds = index_users = 0
+    if norm_content.strip():
+        unique_guilds, index_guilds, index_users = await spam_state.record(
+            message.author.id, content_key, message.guild.id, message.channel.id, message.id
+        )
+    cross_account_spam = (
+        len(norm_content) >= CROSS_ACCOUNT_MIN_LENGTH
+        and index_guilds >= CROSS_ACCOUNT_MIN_GUILDS
+        and index_users >= CROSS_ACCOUNT_MIN_USERS
+    )
+
+    # Near-identical payload (extra emoji, one word swapped) in 5+ servers,
+    # gated on users the same way as the image rule below
+    near_duplicate_guilds = near_duplicate_users = 0
+    if len(norm_content) >= CROSS_ACCOUNT_MIN_LENGTH:
+        guilds, users, user_guilds = near_duplicate_index.record(
+            norm_content, message.guild.id, message.author.id, message.channel.id, message.id,
+            enough_users=CROSS_ACCOUNT_MIN_USERS
+        )
+        if user_guilds >= 5 or users >= CROSS_ACCOUNT_MIN_USERS:
+            near_duplicate_guilds, near_duplicate_users = guilds, users
+
+    # Same image (fake Nitro screenshots, QR codes) in 5+ servers, from one
+    # account or several; a single meme making the rounds is not enough
+    image_guilds = 0
+    image_matches = []  # (image hash, posted by several accounts)
+    if message.attachments:
+        for image_key in await attachment_hashes(message):
+            guilds, users, user_guilds = image_hash_index.record(
+                image_key, message.guild.id, message.author.id, message.channel.id, message.id
+            )
+            if guilds >= 5 and (user_guilds >= 5 or users >= CROSS_ACCOUNT_MIN_USERS):
+                image_guilds = max(image_guilds, guilds)
+                image_matches.append((image_key, users >= CROSS_ACCOUNT_MIN_USERS))
 
     # Condition 1: Same message in 5+ servers in 10 minutes
-    if len(unique_guilds) >= 5:
+    if unique_guilds >= 5 or cross_account_spam or near_duplicate_guilds >= 5 or image_guilds >= 5:
+        # Clean up every copy we know of, not just this one
+        targets = [(message.guild.id, message.channel.id, message.id, message.author.id)]
+        if norm_content.strip():
+            targets += [
+                (gid, cid, mid, message.author.id)
+                for gid, cid, mid in await spam_state.user_messages(message.author.id, content_key)
+            ]
+        if cross_account_spam:
+            targets += [
+                (gid, cid, mid, uid)
+                for gid, uid, cid, mid in await spam_state.postings(content_key)
+            ]
+        # Near-identical copies: every poster's when several accounts pushed
+        # it, otherwise just this author's
+        if near_duplicate_guilds >= 5:
+            shared = near_duplicate_users >= CROSS_ACCOUNT_MIN_USERS
+            targets += [
+                (gid, cid, mid, uid)
+                for gid, uid, cid, mid in near_duplicate_index.postings(norm_content)
+                if shared or uid == message.author.id
+            ]
+        for image_key, shared in image_matches:
+            targets += [
+                (gid, cid, mid, uid)
+                for gid, uid, cid, mid in image_hash_index.postings(image_key)
+                if shared or uid == message.author.id
+            ]
+        if unique_guilds >= 5:
+            rule = "same_user_multi_guild"
+        elif cross_account_spam:
+            rule = "cross_account"
+        elif near_duplicate_guilds >= 5:
+            rule = "near_duplicate"
+        else:
+            rule = "image_multi_guild"
         try:
-            await message.delete()
-            await message.author.timeout(timedelta(hours=24), reason="⚠️ Multi-server spam")
-            print(f"⛔ {message.author} timed out for multi-server spam.")
+            deleted, timed_out = await spam_purger.purge(
+                targets, timedelta(hours=24), reason="⚠️ Multi-server spam"
+            )
+            audit_log.record(
+                "spam_purge", message.author.id, message.guild.id, rule=rule,
+                latency_ms=(time.perf_counter() - started) * 1000, content_hash=content_key,
+                detail=f"deleted={deleted} timed_out={timed_out}"
+            )
         except Exception as e:
-            print(f"Error: {e}")
+            logging.error(f"Spam purge failed for {message.author.id}: {e}")
         return
 
-    # Condition 2 & 3: NSFW keyword detection in any font
-    if any(word in norm_content for word in bad_words):
+    # Condition 2 & 3: NSFW keyword or scam link detection in any font
+    matched_rule = bad_word_matcher.search(norm_content) or blocked_domain_matcher.search(norm_content)
+    if matched_rule:
         try:
             await message.delete()
             await message.author.timeout(timedelta(hours=12), reason="⚠️ NSFW/Scam content")
-            print(f"⚠️ {message.author} timed out for NSFW word.")
+            audit_log.record(
+                "keyword_timeout", message.author.id, message.guild.id, rule=matched_rule,
+                latency_ms=(time.perf_counter() - started) * 1000, content_hash=content_key
+            )
         except Exception as e:
-            print(f"Error: {e}")
+            logging.error(f"Keyword timeout failed for {message.author.id}: {e}")
         return
 
     await bot.process_commands(message)
@@ -691,14 +932,41 @@ async def on_message(message):
 async def on_ready():
     logging.info(f"Logged in as {bot.user} (ID: {bot.user.id})")
     logging.info("------")
-    try:
-        guild = discord.Object(id=1232208366735196283)
-        synced = await tree.sync(guild=guild)  # Only guild sync
-        logging.info(f"Synced {len(synced)} commands.")
-    except Exception as e:
-        logging.error(f"Error syncing commands: {e}")
-    change_status.start()
-    update_uptime_embed.start()
+    memory.report(bot)
+    if is_primary():  # one process syncs and owns the uptime message
+        try:
+            guild = discord.Object(id=1232208366735196283)
+            synced = await sync_if_changed(tree, guild=guild)  # Only guild sync
+            if synced is not None:
+                logging.info(f"Synced {len(synced)} commands.")
+        except Exception as e:
+            logging.error(f"Error syncing commands: {e}")
+        if not update_uptime_embed.is_running():
+            update_uptime_embed.start()
+    if not change_status.is_running():
+        change_status.start()
+    if not report_shards.is_running():
+        report_shards.start()
+    if not reload_bad_words.is_running():
+        reload_bad_words.start()
+    if not sweep_message_tracker.is_running():
+        sweep_message_tracker.start()
+    if not expire_joins.is_running():
+        expire_joins.start()
+    if not log_outbox_stats.is_running():
+        log_outbox_stats.start()
+    if not reload_catalog.is_running():
+        reload_catalog.start()
+    if not log_embed_cache_stats.is_running():
+        log_embed_cache_stats.start()
+    if not verification_queue.is_running():
+        verification_queue.start()
+    if not dm_outbox.is_running():
+        dm_outbox.start()
+    if not flush_raid_actions.is_running():
+        flush_raid_actions.start()
+    if not log_verification_stats.is_running():
+        log_verification_stats.start()
     channel = bot.get_channel(LEGIT_REACTION_CHANNEL_ID)
     if not channel:
         print("❌ Channel not found.")
@@ -726,26 +994,61 @@ async def on_ready():
 
 @bot.event
 async def on_raw_reaction_add(payload):
-    if payload.channel_id == LEGIT_REACTION_CHANNEL_ID and payload.message_id == LEGIT_REACTION_MESSAGE_ID and str(payload.emoji) == LEGIT_REACTION_EMOJI and not payload.member.bot:
-        guild = bot.get_guild(payload.guild_id)
-        role = guild.get_role(LEGIT_REACTION_ROLE_ID)
-        member = payload.member
-        channel = guild.get_channel(payload.channel_id)
-        message = await channel.fetch_message(payload.message_id)
-
-        if role and member and role not in member.roles:
-            await member.add_roles(role)
-            try:
-                await member.send(f"✅ You have been verified with the **{role.name}** role.")
-            except discord.Forbidden:
-                pass
-
-        # Remove reaction to keep count at 1
-        await message.remove_reaction(payload.emoji, member)
+    shard_stats.count(payload.guild_id)
+    if payload.channel_id == LEGIT_REACTION_CHANNEL_ID:
+        verification_queue.submit(payload)
 
 # No removal event → role stays forever
 
 
+@tasks.loop(minutes=10)
+async def sweep_message_tracker():
+    dropped = await spam_state.sweep()
+    if dropped:
+        logging.info(f"🧹 Dropped {dropped} expired spam tracker entries.")
+    logging.info(f"📊 Spam state: {await spam_state.stats()}")
+
+@tasks.loop(minutes=10)
+async def expire_joins():
+    raid_detector.sweep()
+    expired = await join_store.sweep()
+    if expired:
+        logging.info(f"🧹 Expired {expired} joins past the quick-leave window.")
+
+@tasks.loop(minutes=10)
+async def log_outbox_stats():
+    logging.info(f"📨 DM outbox: {len(dm_outbox)} queued, stats {dm_outbox.stats}")
+    logging.info(f"🔎 Entity resolver: {resolver.stats}")
+    logging.info(f"🗂️ Audit log: {audit_log.written} written, {len(audit_log)} queued, {audit_log.dropped} dropped")
+
+@tasks.loop(minutes=5)
+async def report_shards():
+    shard_stats.report()
+
+@tasks.loop(minutes=10)
+async def log_embed_cache_stats():
+    logging.info(f"📊 Embed cache {pass_embeds.stats()}; {paid_id_embeds.stats()}")
+
+@tasks.loop(minutes=1)
+async def log_verification_stats():
+    if len(verification_queue) or verification_queue.latencies:
+        logging.info(f"📊 Verification {verification_queue.stats()}")
+        verification_queue.latencies.clear()  # next report covers the next minute
+
+@tasks.loop(seconds=5)
+async def flush_raid_actions():
+    if len(raid_responder):
+        await raid_responder.flush()
+
+@tasks.loop(seconds=5)
+async def reload_catalog():
+    await catalog.reload_if_changed()
+
+@tasks.loop(seconds=30)
+async def reload_bad_words():
+    bad_word_matcher.reload_if_changed()
+    blocked_domain_matcher.reload_if_changed()
+
 @tasks.loop(seconds=30)  
 async def change_status():
     chosen_status = random.choice(statuses)
@@ -763,30 +1066,41 @@ async def on_app_command_error(interaction: discord.Interaction, error):
 
 @bot.event
 async def on_member_join(member):
-    user_activity[member.id] = {"joined": datetime.utcnow(), "got_role": False}
-    try:
-        await member.send("Thank you for joining the server!")
-        print(f"Sent welcome DM to {member}")
-    except Exception as e:
-        print(f"Failed to send DM: {e}")
+    shard_stats.count(member.guild.id)
+    await join_store.joined(member.guild.id, member.id)
+    raid_started, suspects = raid_detector.record(
+        member.guild.id, member.id, member.name, member.created_at.timestamp()
+    )
+    if raid_started:
+        logging.warning(f"🛡️ Join raid detected in {member.guild.name}; pausing welcome DMs.")
+    raid_responder.add(member.guild.id, suspects)
+    dm_outbox.send(member.guild.id, member.id, "Thank you for joining the server!")
 
 @bot.event
 async def on_member_update(before, after):
-    if not user_activity.get(after.id):
+    if (after.guild.id, after.id) not in join_store:
         return
     before_roles = set(before.roles)
-    after_roles = set(after.roles)
     for role in after.roles:
         if role.name == TARGET_ROLE_NAME and role not in before_roles:
-            user_activity[after.id]["got_role"] = True
+            await join_store.mark_role(after.guild.id, after.id)
 
 @bot.event
-async def on_member_remove(member: discord.Member):
-    activity = user_activity.get(member.id)
-    if not activity or not activity.get("got_role"):
+async def on_raw_member_remove(payload: discord.RawMemberRemoveEvent):
+    # Raw event: fires even if the member was never in the trimmed member cache
+    shard_stats.count(payload.guild_id)
+    member = payload.user
+    guild = bot.get_guild(payload.guild_id)
+    if guild is None:
+        return
+    activity = await join_store.pop(guild.id, member.id)
+    if not activity:
+        return
+    joined, got_role = activity
+    if not got_role:
         return
 
-    time_spent = datetime.now(timezone.utc) - activity["joined"]
+    time_spent = timedelta(seconds=time.time() - joined)
     if time_spent < timedelta(minutes=TIME_LIMIT_MINUTES):
         user_id = member.id
         username = str(member)
@@ -798,32 +1112,26 @@ async def on_member_remove(member: discord.Member):
             "https://cdn.discordapp.com/attachments/1233831270866227271/1379393664962527292/nre_animated_low_mb.gif"
         )
 
-        print(f"[INFO] Detected {username} ({user_id}) left too quickly.")
+        logging.info(f"Detected {username} ({user_id}) left too quickly.")
 
-        # Try DM even after leaving
-        try:
-            user = await bot.fetch_user(user_id)
-            await user.send(msg)
-            print(f"[INFO] DM sent to {username}")
-        except discord.Forbidden:
-            print(f"[WARN] Cannot DM {username} — privacy settings.")
-        except discord.HTTPException as e:
-            print(f"[WARN] DM failed for {username}: {e}")
+        # Try DM even after leaving; held back while the guild is being raided
+        dm_outbox.send(guild.id, user_id, msg, optional=False)
 
         # Ban user by ID
         try:
-            await member.guild.ban(
+            await guild.ban(
                 discord.Object(id=user_id),
                 reason="Accessed file and left within short time.",
                 delete_message_seconds=0
             )
-            print(f"[INFO] Banned {username} ({user_id})")
+            audit_log.record(
+                "quick_leave_ban", user_id, guild.id, rule="quick_leave",
+                detail=f"stayed {int(time_spent.total_seconds())}s"
+            )
         except discord.Forbidden:
-            print(f"[ERROR] Missing permissions to ban {username}")
+            logging.error(f"Missing permissions to ban {username}")
         except discord.HTTPException as e:
-            print(f"[ERROR] Ban failed for {username}: {e}")
-
-    user_activity.pop(member.id, None)
+            logging.error(f"Ban failed for {username}: {e}")
 
 
 
@@ -836,4 +1144,7 @@ if __name__ == "__main__":
         logging.error("DISCORD_TOKEN environment variable not set!")
         sys.exit(1)
 
+    catalog.load()
+    join_store.load()
+
     bot.run(TOKEN)
@@ -0,0 +1,83 @@
+# paid_id_index.py
+
+import re
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+_MENTION_RE = re.compile(r"^<@!?(\d+)>$")
+DATE_FORMAT = "%d-%m-%Y"  # how Date is written in the paid ID catalog
+
+
+def normalize_discord_id(value):
+    """Turn ``<@123>``, ``<@!123>`` or ``123`` into ``123``; anything else is ``None``."""
+    value = str(value or "").strip()
+    match = _MENTION_RE.match(value)
+    if match:
+        return int(match.group(1))
+    return int(value) if value.isdigit() else None
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(str(value).strip(), DATE_FORMAT).date()
+    except ValueError:
+        return None
+
+
+class PaidIdIndex:
+    """Secondary indexes over paid ID records for leak tracing.
+
+    Built as a catalog view, so it is rebuilt and swapped with every reload
+    of the paid ID catalog. Each field maps a normalized value to the set of
+    codes holding it; dates are kept sorted for range queries by bisect.
+    """
+
+    def __init__(self, paid_ids):
+        self.by_discord_id = {}
+        self.by_email = {}
+        self.by_other = {}
+        self.by_file = {}
+        dated = []
+
+        for code, data in paid_ids.items():
+            discord_id = normalize_discord_id(data.get("Discord_id"))
+            if discord_id is not None:
+                self.by_discord_id.setdefault(discord_id, set()).add(code)
+            if data.get("Email"):
+                self.by_email.setdefault(data["Email"].strip().lower(), set()).add(code)
+            if data.get("Othr"):
+                self.by_other.setdefault(str(data["Othr"]).strip(), set()).add(code)
+            if data.get("File_Name"):
+                self.by_file.setdefault(data["File_Name"].strip().lower(), set()).add(code)
+            date = parse_date(data.get("Date", ""))
+            if date is not None:
+                dated.append((date, code))
+
+        dated.sort()
+        self._dates = [d for d, _ in dated]
+        self._dated_codes = [c for _, c in dated]
+
+    def between(self, start=None, end=None):
+        """Codes dated within ``start``..``end`` (inclusive, either may be open)."""
+        lo = bisect_left(self._dates, start) if start else 0
+        hi = bisect_right(self._dates, end) if end else len(self._dates)
+        return set(self._dated_codes[lo:hi])
+
+    def search(self, discord_id=None, email=None, other=None, file_name=None, start=None, end=None):
+        """Codes matching every given field. Returns ``None`` if no field was given."""
+        sets = []
+        if discord_id is not None:
+            sets.append(self.by_discord_id.get(discord_id, set()))
+        if email:
+            sets.append(self.by_email.get(email.strip().lower(), set()))
+        if other:
+            sets.append(self.by_other.get(other.strip(), set()))
+        if file_name:
+            sets.append(self.by_file.get(file_name.strip().lower(), set()))
+        if start or end:
+            sets.append(self.between(start, end))
+        if not sets:
+            return None
+
+        sets.sort(key=len)
+        return sorted(sets[0].intersection(*sets[1:]))
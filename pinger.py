@@ -9,6 +9,8 @@ from datetime import datetime, timedelta
 from discord.ext import commands, tasks
 from discord import app_commands
 from dotenv import load_dotenv
+from command_sync import sync_if_changed
+from memory_profile import MemoryProfile
 
 # Load env variables
 load_dotenv()
@@ -26,7 +28,8 @@ intents.guilds = True
 intents.messages = True
 intents.message_content = True
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+memory = MemoryProfile("pinger", intents)
+bot = commands.Bot(command_prefix="!", **memory.options)
 
 
 
@@ -143,12 +146,13 @@ async def on_ready():
     START_TIME = datetime.now(IST)
 
     print(f"✅ Logged in as {bot.user}")
+    memory.report(bot)
     await bot.change_presence(activity=discord.Activity(
         type=discord.ActivityType.watching,
         name="A heart for bots, not humans... 100% synthetic love 💘⚙️"
     ))
 
-    await bot.tree.sync()
+    await sync_if_changed(bot.tree)
     if not ping_render_urls.is_running():
         ping_render_urls.start()
     if not update_uptime_embed.is_running():
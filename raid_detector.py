@@ -0,0 +1,214 @@
+# raid_detector.py
+
+import re
+import time
+import logging
+from collections import deque
+
+import discord
+
+_NAME_DIGITS_RE = re.compile(r"[\d_.\-]+")
+MAX_BULK_BAN = 200  # Discord's bulk ban limit per request
+
+
+def name_skeleton(name):
+    """``Spammer_1234`` and ``spammer.98`` both become ``spammer#``."""
+    return _NAME_DIGITS_RE.sub("#", name.lower())
+
+
+class JoinRateCounter:
+    """Joins over the last ``window`` seconds, in fixed-size time buckets.
+
+    ``add`` and ``count`` are O(1) amortized: advancing the clock clears
+    only the buckets that fell out of the window since the last call.
+    """
+
+    def __init__(self, window, bucket_seconds):
+        self.bucket_seconds = bucket_seconds
+        self._counts = [0] * max(1, int(window // bucket_seconds))
+        self._head = None  # absolute index of the newest bucket
+        self.total = 0
+
+    def _advance(self, now):
+        index = int(now // self.bucket_seconds)
+        if self._head is None or index - self._head >= len(self._counts):
+            self._counts = [0] * len(self._counts)
+            self.total = 0
+        else:
+            for i in range(self._head + 1, index + 1):
+                slot = i % len(self._counts)
+                self.total -= self._counts[slot]
+                self._counts[slot] = 0
+        if self._head is None or index > self._head:
+            self._head = index
+
+    def add(self, now):
+        self._advance(now)
+        self._counts[self._head % len(self._counts)] += 1
+        self.total += 1
+        return self.total
+
+    def count(self, now):
+        self._advance(now)
+        return self.total
+
+
+class _GuildJoins:
+    __slots__ = ("rate", "recent", "skeletons", "raid_until", "actioned")
+
+    def __init__(self, window, bucket_seconds, max_recent):
+        self.rate = JoinRateCounter(window, bucket_seconds)
+        self.recent = deque(maxlen=max_recent)  # (ts, user_id, young, skeleton)
+        self.skeletons = {}                     # skeleton -> joins in ``recent``
+        self.raid_until = 0.0
+        self.actioned = set()
+
+
+class RaidDetector:
+    """Flags join bursts per guild and picks out the accounts behind them.
+
+    A guild is raiding once ``threshold`` joins land within ``window``
+    seconds, and stays flagged for ``cooldown`` seconds after the last join
+    at that rate. While raiding, a joiner is a suspect if their account
+    is younger than ``young_account_days`` or their name shares a skeleton
+    with ``min_similar`` other recent joiners. When a raid starts the
+    recent joins are swept once, so the first wave is not missed.
+    """
+
+    def __init__(self, window=60, bucket_seconds=5, threshold=10, cooldown=300,
+                 young_account_days=7, min_similar=3, max_recent=500):
+        self.window = window
+        self.bucket_seconds = bucket_seconds
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.young_seconds = young_account_days * 86400
+        self.min_similar = min_similar
+        self.max_recent = max_recent
+        self._guilds = {}
+
+    def _guild(self, guild_id):
+        guild = self._guilds.get(guild_id)
+        if guild is None:
+            guild = self._guilds[guild_id] = _GuildJoins(self.window, self.bucket_seconds, self.max_recent)
+        return guild
+
+    def _forget(self, guild, entry):
+        skeleton = entry[3]
+        left = guild.skeletons[skeleton] - 1
+        if left:
+            guild.skeletons[skeleton] = left
+        else:
+            del guild.skeletons[skeleton]
+
+    def _suspect(self, guild, entry):
+        _, user_id, young, skeleton = entry
+        if user_id in guild.actioned:
+            return False
+        return young or guild.skeletons.get(skeleton, 0) > self.min_similar
+
+    def is_raiding(self, guild_id, now=None):
+        guild = self._guilds.get(guild_id)
+        now = time.time() if now is None else now
+        return guild is not None and guild.raid_until > now
+
+    def record(self, guild_id, user_id, name, created_at, now=None):
+        """Count a join. Returns ``(raid_started, suspect_ids)``.
+
+        ``created_at`` is the account creation time in epoch seconds.
+        """
+        now = time.time() if now is None else now
+        guild = self._guild(guild_id)
+
+        cutoff = now - self.window
+        while guild.recent and guild.recent[0][0] <= cutoff:
+            self._forget(guild, guild.recent.popleft())
+        if len(guild.recent) == guild.recent.maxlen:
+            self._forget(guild, guild.recent[0])  # about to be pushed out
+
+        entry = (now, user_id, now - created_at < self.young_seconds, name_skeleton(name))
+        guild.recent.append(entry)
+        guild.skeletons[entry[3]] = guild.skeletons.get(entry[3], 0) + 1
+
+        was_raiding = guild.raid_until > now
+        if guild.rate.add(now) >= self.threshold:
+            guild.raid_until = now + self.cooldown
+        if guild.raid_until <= now:
+            guild.actioned.clear()
+            return False, []
+
+        started = not was_raiding
+        candidates = guild.recent if started else (entry,)
+        suspects = [e[1] for e in candidates if self._suspect(guild, e)]
+        guild.actioned.update(suspects)
+        return started, suspects
+
+    def sweep(self, now=None):
+        """Drop guilds with no joins in the window and no raid in progress."""
+        now = time.time() if now is None else now
+        idle = [
+            gid for gid, guild in self._guilds.items()
+            if guild.raid_until <= now and guild.rate.count(now) == 0
+        ]
+        for gid in idle:
+            del self._guilds[gid]
+        return len(idle)
+
+
+class RaidResponder:
+    """Collects raid suspects and acts on them in batches.
+
+    ``action`` is ``"ban"`` (bulk ban, up to 200 per request), ``"timeout"``
+    (through the shared SpamPurger) or ``"none"`` to only log. Each suspect
+    acted on is written to ``audit_log`` as ``raid_ban``, ``raid_timeout``
+    or ``raid_flag``.
+    """
+
+    def __init__(self, bot, purger, action="timeout", timeout_duration=None, audit_log=None):
+        self.bot = bot
+        self.purger = purger
+        self.action = action
+        self.timeout_duration = timeout_duration
+        self.audit_log = audit_log
+        self._pending = {}  # guild_id -> set of user ids
+
+    def __len__(self):
+        return sum(map(len, self._pending.values()))
+
+    def add(self, guild_id, user_ids):
+        if user_ids:
+            self._pending.setdefault(guild_id, set()).update(user_ids)
+
+    async def flush(self):
+        """Act on every pending suspect; returns how many were handled."""
+        pending, self._pending = self._pending, {}
+        handled = 0
+        for guild_id, user_ids in pending.items():
+            guild = self.bot.get_guild(guild_id)
+            if guild is None:
+                continue
+            user_ids = sorted(user_ids)
+            acted = user_ids
+            if self.action == "ban":
+                acted = []
+                for i in range(0, len(user_ids), MAX_BULK_BAN):
+                    chunk = [discord.Object(id=uid) for uid in user_ids[i:i + MAX_BULK_BAN]]
+                    try:
+                        result = await guild.bulk_ban(chunk, reason="⚠️ Join raid", delete_message_seconds=3600)
+                        acted += [user.id for user in result.banned]
+                        handled += len(result.banned)
+                    except discord.HTTPException as e:
+                        logging.error(f"Raid bulk ban failed in {guild_id}: {e}")
+            elif self.action == "timeout":
+                _, timed_out = await self.purger.purge(
+                    [(guild_id, None, None, uid) for uid in user_ids],
+                    self.timeout_duration, reason="⚠️ Join raid"
+                )
+                handled += timed_out
+            if self.audit_log is not None:
+                entry = "raid_flag" if self.action == "none" else f"raid_{self.action}"
+                for uid in acted:
+                    self.audit_log.record(
+                        entry, uid, guild_id, rule="join_raid", detail=f"suspects={len(user_ids)}"
+                    )
+            logging.warning(f"🛡️ Raid in {guild.name}: {self.action} for {len(user_ids)} suspects.")
+        return handled
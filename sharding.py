@@ -0,0 +1,62 @@
+# sharding.py
+#
+#   AUTO_SHARD=1                              one process, discord.py picks the shard count
+#   AUTO_SHARD=1 SHARD_COUNT=4 SHARD_IDS=0,1  this process runs shards 0 and 1 of 4
+#
+# When shards are split across processes, set SPAM_STATE_DB to the same
+# SQLite file in each so cross-server spam is still counted across all.
+
+import os
+import time
+import logging
+
+
+def shard_options():
+    """``commands.AutoShardedBot`` keyword arguments from the environment."""
+    options = {}
+    if os.getenv("SHARD_COUNT"):
+        options["shard_count"] = int(os.getenv("SHARD_COUNT"))
+    if os.getenv("SHARD_IDS"):
+        options["shard_ids"] = [int(s) for s in os.getenv("SHARD_IDS").split(",") if s.strip()]
+    return options
+
+
+def auto_shard_enabled():
+    return os.getenv("AUTO_SHARD") == "1"
+
+
+def is_primary():
+    """Whether this process runs shard 0 (or is not split), and so owns one-off jobs."""
+    ids = shard_options().get("shard_ids")
+    return ids is None or 0 in ids
+
+
+class ShardStats:
+    """Per-shard event counts, reported with each shard's gateway latency."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._counts = {}
+        self._since = time.monotonic()
+
+    def shard_for(self, guild_id):
+        shard_count = self.bot.shard_count or 1
+        return (guild_id >> 22) % shard_count if guild_id else 0
+
+    def count(self, guild_id):
+        shard_id = self.shard_for(guild_id)
+        self._counts[shard_id] = self._counts.get(shard_id, 0) + 1
+
+    def report(self):
+        """Log latency and events/s per shard since the last report, then reset."""
+        now = time.monotonic()
+        elapsed = max(now - self._since, 1e-9)
+        latencies = getattr(self.bot, "latencies", None) or [(self.bot.shard_id or 0, self.bot.latency)]
+        parts = []
+        for shard_id, latency in sorted(latencies):
+            rate = self._counts.get(shard_id, 0) / elapsed
+            latency_ms = f"{latency * 1000:.0f}ms" if latency == latency and latency != float("inf") else "n/a"
+            parts.append(f"#{shard_id} {latency_ms} {rate:.1f} ev/s")
+        logging.info(f"📡 Shards: {' | '.join(parts)}")
+        self._counts = {}
+        self._since = now
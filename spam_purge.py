@@ -0,0 +1,82 @@
+# spam_purge.py
+
+import time
+import asyncio
+import logging
+
+import discord
+
+
+class SpamPurger:
+    """Cleans up a spam wave across every guild it landed in at once.
+
+    Deletes and timeouts run concurrently, capped at ``concurrency``
+    requests in flight; discord.py already waits out per-route 429s, the
+    cap just keeps a burst from queueing hundreds of requests. Each action
+    is remembered for ``dedup_seconds`` so repeated detections of the same
+    user do not repeat work.
+    """
+
+    def __init__(self, bot, concurrency=5, dedup_seconds=60):
+        self.bot = bot
+        self.dedup_seconds = dedup_seconds
+        self._slots = asyncio.Semaphore(concurrency)
+        self._done = {}  # action key -> timestamp
+
+    def _claim(self, key, now):
+        last = self._done.get(key)
+        if last is not None and now - last < self.dedup_seconds:
+            return False
+        self._done[key] = now
+        return True
+
+    def _forget_expired(self, now):
+        cutoff = now - self.dedup_seconds
+        for key in [k for k, t in self._done.items() if t <= cutoff]:
+            del self._done[key]
+
+    async def _delete(self, guild_id, channel_id, message_id):
+        channel = self.bot.get_partial_messageable(channel_id, guild_id=guild_id)
+        async with self._slots:
+            try:
+                await channel.get_partial_message(message_id).delete()
+                return True
+            except discord.NotFound:
+                return False
+            except discord.HTTPException as e:
+                logging.warning(f"Purge: could not delete {message_id} in {channel_id}: {e}")
+                return False
+
+    async def _timeout(self, guild_id, user_id, duration, reason):
+        guild = self.bot.get_guild(guild_id)
+        if guild is None:
+            return False
+        async with self._slots:
+            try:
+                member = guild.get_member(user_id) or await guild.fetch_member(user_id)
+                await member.timeout(duration, reason=reason)
+                return True
+            except discord.NotFound:
+                return False
+            except discord.HTTPException as e:
+                logging.warning(f"Purge: could not time out {user_id} in {guild_id}: {e}")
+                return False
+
+    async def purge(self, targets, duration, reason):
+        """Delete every target message and time out each author in its guild.
+
+        ``targets`` holds ``(guild_id, channel_id, message_id, user_id)``
+        tuples. Returns ``(messages_deleted, members_timed_out)``.
+        """
+        now = time.monotonic()
+        self._forget_expired(now)
+
+        deletes, timeouts = [], []
+        for guild_id, channel_id, message_id, user_id in targets:
+            if channel_id and message_id and self._claim(("delete", message_id), now):
+                deletes.append(self._delete(guild_id, channel_id, message_id))
+            if self._claim(("timeout", guild_id, user_id), now):
+                timeouts.append(self._timeout(guild_id, user_id, duration, reason))
+
+        results = await asyncio.gather(*deletes, *timeouts)
+        return sum(results[:len(deletes)]), sum(results[len(deletes):])
@@ -0,0 +1,139 @@
+# spam_state.py
+
+import time
+import sqlite3
+import asyncio
+import threading
+
+from spam_tracker import WINDOW_SECONDS
+
+
+class LocalSpamState:
+    """Exact-hash spam state in this process's memory.
+
+    Every shard run by an AutoShardedBot lives in one process, so they all
+    see the same trackers; this is the default.
+    """
+
+    def __init__(self, user_tracker, content_index):
+        self.user_tracker = user_tracker
+        self.content_index = content_index
+
+    async def record(self, user_id, h, guild_id, channel_id, message_id):
+        """Returns ``(user_guilds, content_guilds, content_users)`` for the window."""
+        user_guilds = self.user_tracker.record(user_id, h, guild_id, channel_id, message_id)
+        content_guilds, content_users = self.content_index.record(h, guild_id, user_id, channel_id, message_id)
+        return user_guilds, content_guilds, content_users
+
+    async def user_messages(self, user_id, h):
+        return self.user_tracker.messages(user_id, h)
+
+    async def postings(self, h):
+        """``(guild_id, user_id, channel_id, message_id)`` of recent copies of ``h``."""
+        return [(gid, uid, cid, mid) for _, _, gid, uid, cid, mid in self.content_index.postings(h)]
+
+    async def sweep(self):
+        return self.user_tracker.sweep()
+
+    async def stats(self):
+        index = self.content_index
+        return f"content index {len(index)} records, hit rate {index.hit_rate():.1%}, stats {index.stats}"
+
+
+def _signed(h):
+    """SQLite integers are signed 64-bit."""
+    return h - (1 << 64) if h >= 1 << 63 else h
+
+
+class SqliteSpamState:
+    """Exact-hash spam state in a SQLite file shared by several bot processes.
+
+    For shards split across processes on one host: every process records
+    its sightings in the same WAL database, so a user or payload hitting
+    guilds on different shards is still counted once across all of them.
+    Queries run in a worker thread so the gateway loop never waits on disk.
+    """
+
+    def __init__(self, path, window=WINDOW_SECONDS):
+        self.path = path
+        self.window = window
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS sightings (
+                ts REAL NOT NULL,
+                hash INTEGER NOT NULL,
+                guild_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                channel_id INTEGER,
+                message_id INTEGER
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sightings_hash ON sightings (hash, ts)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sightings_user ON sightings (user_id, hash, ts)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sightings_ts ON sightings (ts)")
+        self._conn.commit()
+
+    def _record(self, user_id, h, guild_id, channel_id, message_id):
+        now = time.time()
+        cutoff = now - self.window
+        with self._lock:
+            conn = self._conn
+            conn.execute(
+                "INSERT INTO sightings (ts, hash, guild_id, user_id, channel_id, message_id) VALUES (?, ?, ?, ?, ?, ?)",
+                (now, h, guild_id, user_id, channel_id, message_id),
+            )
+            conn.commit()
+            (user_guilds,) = conn.execute(
+                "SELECT COUNT(DISTINCT guild_id) FROM sightings WHERE user_id = ? AND hash = ? AND ts > ?",
+                (user_id, h, cutoff),
+            ).fetchone()
+            content_guilds, content_users = conn.execute(
+                "SELECT COUNT(DISTINCT guild_id), COUNT(DISTINCT user_id) FROM sightings WHERE hash = ? AND ts > ?",
+                (h, cutoff),
+            ).fetchone()
+        return user_guilds, content_guilds, content_users
+
+    def _select(self, sql, params):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*), COUNT(DISTINCT hash) FROM sightings").fetchone()
+
+    def _sweep(self):
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM sightings WHERE ts <= ?", (time.time() - self.window,)
+            ).rowcount
+            self._conn.commit()
+        return deleted
+
+    async def record(self, user_id, h, guild_id, channel_id, message_id):
+        """Returns ``(user_guilds, content_guilds, content_users)`` across all processes."""
+        return await asyncio.to_thread(self._record, user_id, _signed(h), guild_id, channel_id, message_id)
+
+    async def user_messages(self, user_id, h):
+        return await asyncio.to_thread(
+            self._select,
+            "SELECT guild_id, channel_id, message_id FROM sightings "
+            "WHERE user_id = ? AND hash = ? AND ts > ? AND message_id IS NOT NULL",
+            (user_id, _signed(h), time.time() - self.window),
+        )
+
+    async def postings(self, h):
+        return await asyncio.to_thread(
+            self._select,
+            "SELECT guild_id, user_id, channel_id, message_id FROM sightings WHERE hash = ? AND ts > ?",
+            (_signed(h), time.time() - self.window),
+        )
+
+    async def sweep(self):
+        return await asyncio.to_thread(self._sweep)
+
+    async def stats(self):
+        sightings, hashes = await asyncio.to_thread(self._count)
+        return f"{self.path}: {sightings} sightings of {hashes} hashes"
@@ -0,0 +1,432 @@
+# spam_tracker.py
+
+import time
+import zlib
+import hashlib
+import operator
+from collections import deque
+
+WINDOW_SECONDS = 600        # 10 minutes, same as the multi-server spam rule
+MAX_MESSAGES_PER_USER = 50  # ring size; older messages fall off the end
+
+# Cross-account rule only applies to messages long enough to be a payload,
+# so short chatter like "hi" or "gg" in many servers is never flagged.
+CROSS_ACCOUNT_MIN_LENGTH = 20
+CROSS_ACCOUNT_MIN_GUILDS = 5
+CROSS_ACCOUNT_MIN_USERS = 3
+
+
+def content_hash(text):
+    """Stable 64-bit hash of already-normalized message content."""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class _UserHistory:
+    __slots__ = ("entries", "guilds", "last_seen")
+
+    def __init__(self, maxlen):
+        self.entries = deque(maxlen=maxlen)  # (hash, timestamp, guild_id, channel_id, message_id)
+        self.guilds = {}                     # hash -> {guild_id: count}
+        self.last_seen = 0.0
+
+
+class UserMessageTracker:
+    """Per-user ring buffer of recent message hashes.
+
+    Each user keeps at most ``max_messages`` entries from the last ``window``
+    seconds. Per-hash guild counts are updated as entries are added and
+    dropped, so ``record`` is O(1) amortized instead of rebuilding the list.
+    """
+
+    def __init__(self, window=WINDOW_SECONDS, max_messages=MAX_MESSAGES_PER_USER):
+        self.window = window
+        self.max_messages = max_messages
+        self._users = {}
+
+    def __len__(self):
+        return len(self._users)
+
+    def _drop(self, history, entry):
+        h, _, gid = entry[:3]
+        counts = history.guilds[h]
+        counts[gid] -= 1
+        if not counts[gid]:
+            del counts[gid]
+            if not counts:
+                del history.guilds[h]
+
+    def record(self, user_id, h, guild_id, channel_id=None, message_id=None, now=None):
+        """Track a message hash and return how many guilds it was seen in recently."""
+        now = time.time() if now is None else now
+
+        history = self._users.get(user_id)
+        if history is None:
+            history = self._users[user_id] = _UserHistory(self.max_messages)
+
+        entries = history.entries
+        cutoff = now - self.window
+        while entries and entries[0][1] <= cutoff:
+            self._drop(history, entries.popleft())
+        if len(entries) == entries.maxlen:
+            self._drop(history, entries.popleft())
+
+        entries.append((h, now, guild_id, channel_id, message_id))
+        counts = history.guilds.setdefault(h, {})
+        counts[guild_id] = counts.get(guild_id, 0) + 1
+        history.last_seen = now
+        return len(counts)
+
+    def messages(self, user_id, h):
+        """Return ``(guild_id, channel_id, message_id)`` of the user's recent copies of ``h``."""
+        history = self._users.get(user_id)
+        if history is None or h not in history.guilds:
+            return []
+        return [(gid, cid, mid) for eh, _, gid, cid, mid in history.entries if eh == h and mid]
+
+    def sweep(self, now=None):
+        """Forget users who have not posted within the window. Returns how many."""
+        now = time.time() if now is None else now
+        cutoff = now - self.window
+        idle = [uid for uid, history in self._users.items() if history.last_seen <= cutoff]
+        for uid in idle:
+            del self._users[uid]
+        return len(idle)
+
+
+class _ContentBucket:
+    __slots__ = ("records", "guilds", "users")
+
+    def __init__(self):
+        self.records = deque()  # (timestamp, hash, guild_id, user_id, channel_id, message_id)
+        self.guilds = {}        # guild_id -> count
+        self.users = {}         # user_id -> count
+
+
+def _decrement(counts, key):
+    counts[key] -= 1
+    if not counts[key]:
+        del counts[key]
+
+
+class ContentIndex:
+    """Global sliding-window index from content hash to recent postings.
+
+    Catches the same payload pushed by many accounts across our guilds,
+    which the per-user tracker cannot see. Records older than ``window``
+    seconds expire, and once ``max_records`` are held the oldest posting is
+    evicted first, so memory stays bounded during a spam wave.
+    """
+
+    def __init__(self, window=WINDOW_SECONDS, max_records=100_000):
+        self.window = window
+        self.max_records = max_records
+        self._buckets = {}
+        self._order = deque()  # every record, oldest first
+        self.stats = {"lookups": 0, "hits": 0, "expired": 0, "evicted": 0}
+
+    def __len__(self):
+        return len(self._order)
+
+    def _pop_oldest(self):
+        record = self._order.popleft()
+        h = record[1]
+        bucket = self._buckets[h]
+        bucket.records.popleft()
+        _decrement(bucket.guilds, record[2])
+        _decrement(bucket.users, record[3])
+        if not bucket.records:
+            del self._buckets[h]
+
+    def _expire(self, now):
+        cutoff = now - self.window
+        order = self._order
+        while order and order[0][0] <= cutoff:
+            self._pop_oldest()
+            self.stats["expired"] += 1
+        while len(order) >= self.max_records:
+            self._pop_oldest()
+            self.stats["evicted"] += 1
+
+    def record(self, h, guild_id, user_id, channel_id, message_id, now=None):
+        """Add a posting and return ``(guild_count, user_count)`` for its hash."""
+        now = time.time() if now is None else now
+        self._expire(now)
+
+        self.stats["lookups"] += 1
+        bucket = self._buckets.get(h)
+        if bucket is None:
+            bucket = self._buckets[h] = _ContentBucket()
+        else:
+            self.stats["hits"] += 1
+
+        record = (now, h, guild_id, user_id, channel_id, message_id)
+        self._order.append(record)
+        bucket.records.append(record)
+        bucket.guilds[guild_id] = bucket.guilds.get(guild_id, 0) + 1
+        bucket.users[user_id] = bucket.users.get(user_id, 0) + 1
+        return len(bucket.guilds), len(bucket.users)
+
+    def postings(self, h):
+        """Return the recent ``(timestamp, hash, guild_id, user_id, channel_id, message_id)`` records."""
+        bucket = self._buckets.get(h)
+        return list(bucket.records) if bucket else []
+
+    def hit_rate(self):
+        lookups = self.stats["lookups"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+
+# ----------- Near-duplicate detection (MinHash / LSH) -----------
+
+MINHASH_PERMUTATIONS = 32  # signature length; must be a power of two
+LSH_BANDS = 8  # 8 bands of 4 rows: ~0.6 Jaccard is where matches start to stick
+SHINGLE_SIZE = 4
+MAX_SHINGLE_CHARS = 512  # long pastes are signed on their first 512 chars
+
+_BIN_BITS = MINHASH_PERMUTATIONS.bit_length() - 1
+_EMPTY_BIN = 1 << 32
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """CRC32 hashes of the character shingles of ``text``."""
+    data = " ".join(text.split()).encode("utf-8")[:MAX_SHINGLE_CHARS]
+    if len(data) <= size:
+        return {zlib.crc32(data)} if data else set()
+    return {zlib.crc32(data[i:i + size]) for i in range(len(data) - size + 1)}
+
+
+def minhash(text):
+    """MinHash signature of ``text``, or ``None`` when it has no shingles.
+
+    Uses one-permutation hashing: each shingle hash goes to one of
+    ``MINHASH_PERMUTATIONS`` bins by its low bits and every bin keeps its
+    minimum, so the signature costs one pass instead of one per permutation.
+    Empty bins borrow from the next filled bin to the right.
+    """
+    values = shingles(text)
+    if not values:
+        return None
+
+    bins = MINHASH_PERMUTATIONS
+    mask = bins - 1
+    sig = [_EMPTY_BIN] * bins
+    for v in values:
+        b = v & mask
+        v >>= _BIN_BITS
+        if v < sig[b]:
+            sig[b] = v
+
+    if _EMPTY_BIN in sig:
+        for i in range(bins):
+            if sig[i] == _EMPTY_BIN:
+                for step in range(1, bins):
+                    borrowed = sig[(i + step) & mask]
+                    if borrowed < _EMPTY_BIN:
+                        # Offset by distance so borrowed values never equal real ones
+                        sig[i] = borrowed + (step << 32)
+                        break
+    return tuple(sig)
+
+
+class NearDuplicateIndex:
+    """LSH band index of recent message signatures in a sliding window.
+
+    Each message's MinHash signature is split into ``bands``; two messages
+    that share any band are candidate near-duplicates. Only the candidates
+    in matching band buckets are checked, so a lookup does not scan every
+    tracked message. Candidates are confirmed by signature similarity.
+    A bucket only keeps the latest record per guild and user, so a lookup
+    checks at most one candidate per poster and band even in the middle of
+    a wave.
+    """
+
+    def __init__(self, window=WINDOW_SECONDS, bands=LSH_BANDS, threshold=0.7, max_records=50_000):
+        self.window = window
+        self.bands = bands
+        self.rows = MINHASH_PERMUTATIONS // bands
+        self.threshold = threshold
+        self.max_records = max_records
+        self._buckets = {}     # (band, band_hash) -> {(guild_id, user_id): latest record}
+        self._order = deque()  # (timestamp, signature, guild_id, band keys, user_id, channel_id, message_id)
+
+    def __len__(self):
+        return len(self._order)
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [(i, hash(signature[i * rows:(i + 1) * rows])) for i in range(self.bands)]
+
+    def _pop_oldest(self):
+        record = self._order.popleft()
+        poster = (record[2], record[4])
+        for key in record[3]:
+            bucket = self._buckets.get(key)
+            if bucket and bucket.get(poster) is record:
+                del bucket[poster]
+                if not bucket:
+                    del self._buckets[key]
+
+    def _expire(self, now):
+        cutoff = now - self.window
+        order = self._order
+        while order and (order[0][0] <= cutoff or len(order) >= self.max_records):
+            self._pop_oldest()
+
+    def record(self, text, guild_id, user_id, channel_id=None, message_id=None, now=None,
+               enough=5, enough_users=CROSS_ACCOUNT_MIN_USERS):
+        """Add a message posted by ``user_id``.
+
+        Returns ``(guilds, users, user_guilds)`` for near-identical text in
+        the window: distinct guilds, distinct users, and distinct guilds this
+        user posted it in. Counting stops once ``enough`` guilds are found
+        and either this user is in ``enough`` of them or ``enough_users``
+        users are, which is all the spam rule needs and keeps lookups short
+        during a wave.
+        """
+        now = time.time() if now is None else now
+        signature = minhash(text)
+        if signature is None:
+            return 0, 0, 0
+        self._expire(now)
+
+        keys = self._band_keys(signature)
+        guilds, users, user_guilds = {guild_id}, {user_id}, {guild_id}
+        seen = set()
+        done = False
+        needed = self.threshold * len(signature)
+        buckets = self._buckets
+        for key in keys:
+            bucket = buckets.get(key)
+            if not bucket:
+                continue
+            for poster, record in bucket.items():
+                if id(record) in seen:
+                    continue
+                seen.add(id(record))
+                other = record[1]
+                if other == signature or sum(map(operator.eq, signature, other)) >= needed:
+                    gid, uid = poster
+                    guilds.add(gid)
+                    users.add(uid)
+                    if uid == user_id:
+                        user_guilds.add(gid)
+                    done = len(guilds) >= enough and (len(user_guilds) >= enough or len(users) >= enough_users)
+                    if done:
+                        break
+            if done:
+                break
+
+        record = (now, signature, guild_id, keys, user_id, channel_id, message_id)
+        self._order.append(record)
+        poster = (guild_id, user_id)
+        for key in keys:
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = {poster: record}
+            else:
+                bucket[poster] = record
+        return len(guilds), len(users), len(user_guilds)
+
+    def postings(self, text, now=None):
+        """``(guild_id, user_id, channel_id, message_id)`` of recent near-identical messages."""
+        signature = minhash(text)
+        if signature is None:
+            return []
+        self._expire(time.time() if now is None else now)
+        needed = self.threshold * len(signature)
+        seen, found = set(), []
+        for key in self._band_keys(signature):
+            for record in self._buckets.get(key, {}).values():
+                if id(record) in seen:
+                    continue
+                seen.add(id(record))
+                other = record[1]
+                if other == signature or sum(map(operator.eq, signature, other)) >= needed:
+                    found.append((record[2], record[4], record[5], record[6]))
+        return found
+
+
+# ----------- Image spam (perceptual hash index) -----------
+
+class ImageHashIndex:
+    """Sliding-window multi-index over 64-bit perceptual image hashes.
+
+    Each hash is split into four 16-bit chunks with one bucket table per
+    chunk. Two hashes within ``max_distance`` bits (< 4) must agree on at
+    least one chunk, so a lookup only checks the records sharing a chunk
+    instead of the whole index.
+    """
+
+    CHUNKS = 4
+
+    def __init__(self, window=WINDOW_SECONDS, max_distance=3, max_records=200_000, max_bucket=500):
+        if max_distance >= self.CHUNKS:
+            raise ValueError("max_distance must be smaller than the chunk count")
+        self.window = window
+        self.max_distance = max_distance
+        self.max_records = max_records
+        self.max_bucket = max_bucket
+        self._buckets = {}     # (chunk, value) -> deque of records
+        self._order = deque()  # (timestamp, hash, guild_id, keys, user_id, channel_id, message_id)
+
+    def __len__(self):
+        return len(self._order)
+
+    def _keys(self, h):
+        return [(i, (h >> (16 * i)) & 0xFFFF) for i in range(self.CHUNKS)]
+
+    def _pop_oldest(self):
+        record = self._order.popleft()
+        for key in record[3]:
+            bucket = self._buckets.get(key)
+            if bucket and bucket[0] is record:
+                bucket.popleft()
+                if not bucket:
+                    del self._buckets[key]
+
+    def _expire(self, now):
+        cutoff = now - self.window
+        order = self._order
+        while order and (order[0][0] <= cutoff or len(order) >= self.max_records):
+            self._pop_oldest()
+
+    def record(self, h, guild_id, user_id, channel_id=None, message_id=None, now=None):
+        """Add an image hash posted by ``user_id``.
+
+        Returns ``(guilds, users, user_guilds)`` for near-identical images in
+        the window: distinct guilds, distinct users, and distinct guilds this
+        user posted it in.
+        """
+        now = time.time() if now is None else now
+        self._expire(now)
+
+        keys = self._keys(h)
+        guilds, users, user_guilds = {guild_id}, {user_id}, {guild_id}
+        limit = self.max_distance
+        for key in keys:
+            for record in self._buckets.get(key, ()):
+                if (record[1] ^ h).bit_count() <= limit:
+                    guilds.add(record[2])
+                    users.add(record[4])
+                    if record[4] == user_id:
+                        user_guilds.add(record[2])
+
+        record = (now, h, guild_id, keys, user_id, channel_id, message_id)
+        self._order.append(record)
+        for key in keys:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = deque(maxlen=self.max_bucket)
+            bucket.append(record)
+        return len(guilds), len(users), len(user_guilds)
+
+    def postings(self, h, now=None):
+        """``(guild_id, user_id, channel_id, message_id)`` of recent near-identical images."""
+        self._expire(time.time() if now is None else now)
+        seen, found = set(), []
+        for key in self._keys(h):
+            for record in self._buckets.get(key, ()):
+                if id(record) not in seen and (record[1] ^ h).bit_count() <= self.max_distance:
+                    seen.add(id(record))
+                    found.append((record[2], record[4], record[5], record[6]))
+        return found
@@ -0,0 +1,35 @@
+import random
+
+from message_packer import MESSAGE_LIMIT, pack_messages
+
+FENCE = "```"
+
+
+def test_fence_opened_near_the_limit_still_fits():
+    block = "\n".join(["x" * 1960, "y" * 32, FENCE, "z" * 15])
+    messages = pack_messages([block])
+    assert max(map(len, messages)) <= MESSAGE_LIMIT
+
+
+def test_short_parts_are_merged():
+    assert pack_messages(["a", "b", "", "c"]) == ["a\n\nb\n\nc"]
+
+
+def test_random_pages_never_exceed_the_limit():
+    rng = random.Random(0)
+    for _ in range(3000):
+        texts = []
+        for _ in range(4):
+            lines = []
+            for _ in range(rng.randint(0, 60)):
+                r = rng.random()
+                if r < 0.2:
+                    lines.append("")
+                elif r < 0.3:
+                    lines.append(FENCE + rng.choice(["", "py"]))
+                else:
+                    lines.append("x" * rng.choice([5, 32, 50, 300, 1960, 2500]))
+            texts.append("\n".join(lines))
+        messages = pack_messages(texts)
+        assert max(map(len, messages), default=0) <= MESSAGE_LIMIT
+        assert all(messages)
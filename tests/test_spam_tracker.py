@@ -0,0 +1,133 @@
+from spam_tracker import MINHASH_PERMUTATIONS, ImageHashIndex, NearDuplicateIndex, minhash
+
+IMAGE = 0x0F0F33CC55AA9966
+
+
+def test_image_counts_guilds_users_and_own_guilds():
+    index = ImageHashIndex()
+    for guild_id in range(5):
+        result = index.record(IMAGE ^ (1 << guild_id), guild_id, user_id=1, now=100)
+    assert result == (5, 1, 5)
+
+
+def test_image_shared_by_different_users_is_not_one_users_spam():
+    index = ImageHashIndex()
+    for guild_id in range(5):
+        guilds, users, user_guilds = index.record(IMAGE, guild_id, user_id=10 + guild_id % 2, now=100)
+    assert (guilds, users) == (5, 2)
+    assert user_guilds < 5
+
+
+def test_unrelated_images_do_not_match():
+    index = ImageHashIndex()
+    index.record(IMAGE, 1, user_id=1, now=100)
+    assert index.record(~IMAGE & (2 ** 64 - 1), 2, user_id=1, now=100) == (1, 1, 1)
+
+
+def test_image_postings_cover_every_guild():
+    index = ImageHashIndex()
+    for guild_id in range(5):
+        index.record(IMAGE ^ (1 << guild_id), guild_id, 1, guild_id * 10, 100 + guild_id, now=100)
+    index.record(~IMAGE & (2 ** 64 - 1), 9, 1, 90, 999, now=100)
+    postings = index.postings(IMAGE, now=100)
+    assert sorted(postings) == [(g, 1, g * 10, 100 + g) for g in range(5)]
+
+
+SPAM = "free nitro giveaway claim your gift now at discord-gifts dot com before it expires"
+VARIANTS = [  # all within 0.7 of each other
+    SPAM,
+    SPAM + " !!",
+    "hey " + SPAM,
+    SPAM + " 🎁",
+    SPAM.replace("free", "FREE"),
+]
+
+
+def _similarity(a, b):
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def test_minhash_signature_shape():
+    signature = minhash(SPAM)
+    assert len(signature) == MINHASH_PERMUTATIONS
+    assert signature == minhash(SPAM)
+    assert minhash("") is None
+
+
+def test_minhash_fills_every_bin_for_short_text():
+    signature = minhash("short text")  # fewer shingles than bins
+    assert len(set(signature)) == len(signature)
+    assert max(signature) < MINHASH_PERMUTATIONS << 32
+
+
+def test_minhash_similarity_tracks_text_similarity():
+    unrelated = "anyone up for ranked tonight, i need two more for the squad"
+    assert _similarity(minhash(SPAM), minhash(SPAM + " !!")) >= 0.7
+    assert _similarity(minhash(SPAM), minhash(unrelated)) < 0.3
+
+
+def test_near_duplicates_are_counted_across_guilds():
+    index = NearDuplicateIndex()
+    counts = [index.record(text, guild_id, 1, now=100) for guild_id, text in enumerate(VARIANTS)]
+    assert counts == [(1, 1, 1), (2, 1, 2), (3, 1, 3), (4, 1, 4), (5, 1, 5)]
+
+
+def test_two_users_alternating_stay_below_both_gates():
+    index = NearDuplicateIndex()
+    for guild_id in range(5):
+        guilds, users, user_guilds = index.record(SPAM, guild_id, 10 + guild_id % 2, now=100)
+    assert (guilds, users) == (5, 2)
+    assert user_guilds == 3
+
+
+def test_same_guild_counts_once():
+    index = NearDuplicateIndex()
+    for _ in range(5):
+        count = index.record(SPAM, 1, 1, now=100)
+    assert count == (1, 1, 1)
+
+
+def test_only_guilds_with_a_close_match_are_counted():
+    index = NearDuplicateIndex()
+    index.record(SPAM.replace("claim", "grab"), 1, 1, now=100)
+    index.record(SPAM, 2, 1, now=100)
+    # Close to the second post, but two word swaps away from the first
+    assert index.record(SPAM.replace("now", "today"), 3, 1, now=100)[0] == 2
+
+
+def test_different_texts_do_not_match():
+    index = NearDuplicateIndex()
+    texts = [
+        "anyone up for ranked tonight, i need two more for the squad",
+        "the patch notes for the new season dropped this morning",
+        "does anyone know how to get the event skin before friday",
+        "good morning everyone, hope you all have a great weekend",
+        "i just finished the raid, the last boss was brutal",
+    ]
+    counts = [index.record(text, guild_id, guild_id, now=100) for guild_id, text in enumerate(texts)]
+    assert counts == [(1, 1, 1)] * len(texts)
+
+
+def test_count_stops_at_enough():
+    index = NearDuplicateIndex()
+    for guild_id in range(10):
+        index.record(SPAM, guild_id, 1, now=100)
+    assert index.record(SPAM, 99, 1, now=100) == (5, 1, 5)
+    assert index.record(SPAM, 100, 1, now=100, enough=20) == (12, 1, 12)
+
+
+def test_near_duplicates_expire_with_the_window():
+    index = NearDuplicateIndex(window=60)
+    for guild_id in range(4):
+        index.record(SPAM, guild_id, 1, now=100)
+    assert index.record(SPAM, 10, 1, now=200) == (1, 1, 1)
+
+
+def test_near_duplicate_postings_cover_every_guild():
+    index = NearDuplicateIndex()
+    for guild_id, text in enumerate(VARIANTS):
+        index.record(text, guild_id, 7, guild_id * 10, 100 + guild_id, now=100)
+    index.record("anyone up for ranked tonight, i need two more for the squad", 9, 7, 90, 999, now=100)
+    postings = index.postings(SPAM, now=100)
+    assert sorted(postings) == [(g, 7, g * 10, 100 + g) for g in range(5)]
+    assert index.postings(SPAM, now=1000) == []
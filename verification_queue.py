@@ -0,0 +1,142 @@
+# verification_queue.py
+
+import time
+import asyncio
+import logging
+from collections import deque
+
+import discord
+
+# Minimum spacing between calls on the same route, in seconds. discord.py
+# still handles 429s; pacing keeps a burst from running into them.
+ROUTE_INTERVALS = {
+    "add_role": 0.1,
+    "remove_reaction": 0.25,  # reaction routes have the tightest bucket
+    "dm": 0.2,
+}
+
+
+class RoutePacer:
+    """Spaces out calls per route so bursts drain at a steady rate."""
+
+    def __init__(self, intervals):
+        self.intervals = intervals
+        self._next = {}  # route -> earliest monotonic time for the next call
+
+    async def wait(self, route):
+        now = time.monotonic()
+        at = max(now, self._next.get(route, now))
+        self._next[route] = at + self.intervals.get(route, 0)
+        if at > now:
+            await asyncio.sleep(at - now)
+
+
+class VerificationQueue:
+    """Grants the verified role for reactions on one message, off the gateway path.
+
+    ``submit`` only queues the reaction; workers take batches from the
+    queue, grant the role, DM the member and clear the reaction through a
+    partial message, so nothing has to be fetched first. A user already
+    waiting in the queue is not queued twice.
+    """
+
+    def __init__(self, bot, channel_id, message_id, emoji, role_id,
+                 workers=2, batch_size=10, concurrency=4, intervals=ROUTE_INTERVALS, audit_log=None,
+                 on_verified=None):
+        self.bot = bot
+        self.channel_id = channel_id
+        self.message_id = message_id
+        self.emoji = emoji
+        self.role_id = role_id
+        self.workers = workers
+        self.batch_size = batch_size
+        self.audit_log = audit_log
+        self.on_verified = on_verified  # awaited with the member after a role grant
+        self.pacer = RoutePacer(intervals)
+        self._slots = asyncio.Semaphore(concurrency)
+        self._queue = asyncio.Queue()
+        self._pending = set()  # user ids waiting in the queue
+        self._tasks = []
+        self.latencies = deque(maxlen=1000)  # seconds from reaction to done
+        self.verified = 0
+        self.skipped = 0
+
+    def __len__(self):
+        return self._queue.qsize()
+
+    def is_running(self):
+        return any(not task.done() for task in self._tasks)
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def submit(self, payload):
+        """Queue a raw reaction payload; returns False for duplicates and other messages."""
+        if (
+            payload.message_id != self.message_id
+            or str(payload.emoji) != self.emoji
+            or payload.member is None
+            or payload.member.bot
+        ):
+            return False
+        if payload.user_id in self._pending:
+            self.skipped += 1
+            return False
+        self._pending.add(payload.user_id)
+        self._queue.put_nowait((payload.member, time.monotonic()))
+        return True
+
+    async def _worker(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await asyncio.gather(*(self._verify(member, queued_at) for member, queued_at in batch))
+            for _ in batch:
+                self._queue.task_done()
+
+    async def _verify(self, member, queued_at):
+        try:
+            async with self._slots:
+                role = member.guild.get_role(self.role_id)
+                if role and role not in member.roles:
+                    await self.pacer.wait("add_role")
+                    await member.add_roles(role, reason="Reaction verification")
+                    self.verified += 1
+                    if self.audit_log is not None:
+                        self.audit_log.record(
+                            "verify", member.id, member.guild.id, rule="legit_reaction",
+                            latency_ms=(time.monotonic() - queued_at) * 1000
+                        )
+                    if self.on_verified is not None:
+                        await self.on_verified(member)
+                    await self.pacer.wait("dm")
+                    try:
+                        await member.send(f"✅ You have been verified with the **{role.name}** role.")
+                    except discord.Forbidden:
+                        pass
+
+                # Remove reaction to keep count at 1
+                await self.pacer.wait("remove_reaction")
+                message = self.bot.get_partial_messageable(
+                    self.channel_id, guild_id=member.guild.id
+                ).get_partial_message(self.message_id)
+                await message.remove_reaction(self.emoji, member)
+        except Exception as e:  # keep the worker alive
+            logging.warning(f"Verification failed for {member} ({member.id}): {e}")
+        finally:
+            self._pending.discard(member.id)
+            self.latencies.append(time.monotonic() - queued_at)
+
+    def stats(self):
+        samples = sorted(self.latencies)
+        if samples:
+            p50 = samples[len(samples) // 2]
+            p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+            timing = f"p50 {p50:.2f}s, p95 {p95:.2f}s"
+        else:
+            timing = "no samples"
+        return (
+            f"queue depth {len(self)}, {self.verified} verified, "
+            f"{self.skipped} duplicates skipped, {timing}"
+        )
@@ -0,0 +1,181 @@
+# word_filter.py
+
+import os
+import logging
+import unicodedata
+from collections import deque
+from functools import lru_cache
+
+
+# ----------- Text Normalization -----------
+
+# Look-alikes that NFKD leaves alone (Cyrillic/Greek letters and friends).
+_HOMOGLYPHS = {
+    "а": "a", "в": "b", "е": "e", "ё": "e", "к": "k", "м": "m", "н": "h",
+    "о": "o", "р": "p", "с": "c", "т": "t", "у": "y", "х": "x", "ѕ": "s",
+    "і": "i", "ї": "i", "ј": "j", "ԁ": "d", "ɡ": "g", "ӏ": "l", "ɩ": "i",
+    "α": "a", "β": "b", "ε": "e", "η": "n", "ι": "i", "κ": "k", "ν": "v",
+    "ο": "o", "ρ": "p", "τ": "t", "υ": "u", "χ": "x", "ω": "w",
+}
+
+# Leetspeak digits/symbols, only used for the second keyword pass.
+_LEET = str.maketrans({
+    "0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t",
+    "@": "a", "$": "s", "!": "i", "|": "l",
+})
+
+# Regional indicator letters (🇦 .. 🇿) are a popular fake font.
+_CONFUSABLES = {ord(ch): folded for ch, folded in _HOMOGLYPHS.items()}
+_CONFUSABLES.update({ord(ch.upper()): folded for ch, folded in _HOMOGLYPHS.items()})
+_CONFUSABLES.update({0x1F1E6 + i: chr(ord("a") + i) for i in range(26)})
+_CONFUSABLE_CHARS = frozenset(map(chr, _CONFUSABLES))
+
+
+@lru_cache(maxsize=2048)
+def normalize_text(text):
+    """Lowercase ASCII form of ``text`` with accents, fancy fonts and
+    homoglyphs folded to plain letters. Spam waves repeat the same strings,
+    so results are memoized."""
+    if text.isascii():
+        return text.lower()
+    folded = unicodedata.normalize("NFKD", text)
+    # str.translate walks every character in Python-level lookups, so only
+    # pay for it when a look-alike NFKD does not handle is actually present.
+    if not _CONFUSABLE_CHARS.isdisjoint(folded):
+        folded = folded.translate(_CONFUSABLES)
+    return folded.encode("ascii", "ignore").decode("ascii").lower()
+
+
+def fold_leet(text):
+    """Map leetspeak digits and symbols in normalized text to letters."""
+    return text.translate(_LEET)
+
+
+# ----------- Keyword Matching -----------
+
+class KeywordMatcher:
+    """Aho-Corasick automaton built once over a list of keywords.
+
+    A message is scanned in a single pass no matter how many keywords are
+    loaded, so the cost per message stays flat as the list grows.
+    """
+
+    def __init__(self, words):
+        self.words = tuple(dict.fromkeys(w for w in words if w))
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [None]
+
+        for word in self.words:
+            self._insert(word)
+        self._build_links()
+
+    def __len__(self):
+        return len(self.words)
+
+    def _insert(self, word):
+        state = 0
+        for ch in word:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(None)
+                self._goto[state][ch] = nxt
+            state = nxt
+        if self._out[state] is None:
+            self._out[state] = word
+
+    def _build_links(self):
+        goto, fail, out = self._goto, self._fail, self._out
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                # Inherit the match of the longest proper suffix so a hit is
+                # reported without walking the fail chain at search time.
+                if out[nxt] is None:
+                    out[nxt] = out[fail[nxt]]
+
+    def search(self, text):
+        """Return the first keyword found in ``text``, or ``None``."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state] is not None:
+                return out[state]
+        return None
+
+
+def load_keywords(path):
+    """Read one keyword per line, skipping blanks and ``#`` comments."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [
+            line.strip().lower() for line in f
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+
+
+class ReloadableMatcher:
+    """Keeps a compiled ``KeywordMatcher`` in sync with a keyword file.
+
+    When ``path`` does not exist the built-in ``default_words`` are used.
+    A reload compiles a fresh automaton and swaps the reference in one
+    assignment, so ``search`` never sees a half-built matcher.
+    Subclasses swap in another ``matcher_class`` for other list types.
+    """
+
+    matcher_class = KeywordMatcher
+    kind = "filter keywords"
+
+    def __init__(self, path, default_words):
+        self.path = path
+        self.default_words = list(default_words)
+        self._mtime = None
+        self.matcher = self.matcher_class(self.default_words)
+        self.reload_if_changed()
+
+    def search(self, text):
+        """Search normalized text, then its leetspeak-folded form.
+
+        Keywords are matched as written on the first pass, so entries such
+        as ``d1scord.`` whose plain form is a legitimate domain still work.
+        """
+        matcher = self.matcher
+        found = matcher.search(text)
+        if found is None:
+            folded = fold_leet(text)
+            if folded != text:
+                found = matcher.search(folded)
+        return found
+
+    def reload_if_changed(self):
+        """Rebuild the matcher if the keyword file changed. Returns True on swap."""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+
+        if mtime == self._mtime:
+            return False
+
+        try:
+            words = load_keywords(self.path) if mtime is not None else self.default_words
+            matcher = self.matcher_class(words)
+        except Exception as e:
+            logging.error(f"Failed to reload {self.kind} from {self.path}: {e}")
+            return False
+
+        self.matcher = matcher
+        self._mtime = mtime
+        logging.info(f"🔁 Loaded {len(matcher)} {self.kind}.")
+        return True